@@ -1,9 +1,88 @@
-from spoon_ai.tools.base import BaseTool
-from spoon_ai.agents import ToolCallAgent
-from spoon_ai.tools import ToolManager
-from pydantic import BaseModel, Field
-import requests
+import asyncio
 import os
+import sys
+import time
+
+_import_started = time.perf_counter()
+
+# Make `agents.*` importable both as a script (python3 agents/agent_oracle.py) and as a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings come from the environment; a .env file (see README) fills in whatever is unset
+from dotenv import load_dotenv
+load_dotenv()
+
+from pydantic import BaseModel
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+import numpy as np
+
+from agents.market_data import MarketDataClient, COINGECKO_MARKETS_URL
+from agents.volatility import VolatilityEngine
+from agents.risk_rules import (
+    LOW, MEDIUM, CRITICAL, RISK_LEVELS, snapshot_metrics, classify,
+)
+from agents.risk_stream import RiskBroadcaster, format_sse
+from agents.logs import get_logger
+from agents import metrics
+from agents.metrics import COINGECKO_LATENCY, ERRORS, HTTP_LATENCY, RISK_TRANSITIONS
+
+log = get_logger("oracle")
+
+# --- MARKET DATA CONFIGURATION ---
+MARKETS_URL = os.getenv("ORACLE_COINGECKO_URL", COINGECKO_MARKETS_URL)
+MARKET_TTL_SECONDS = float(os.getenv("ORACLE_MARKET_TTL", "10"))
+MARKET_STALE_SECONDS = float(os.getenv("ORACLE_MARKET_STALE_TTL", "60"))
+MARKET_TIMEOUT_SECONDS = float(os.getenv("ORACLE_MARKET_TIMEOUT", "5"))
+
+# --- VOLATILITY ENGINE CONFIGURATION ---
+VOL_WINDOW_TICKS = int(os.getenv("ORACLE_VOL_WINDOW", "360"))  # ~1h of 10s poller ticks
+VOL_EWMA_LAMBDA = float(os.getenv("ORACLE_VOL_LAMBDA", "0.94"))
+VOL_MIN_TICKS = int(os.getenv("ORACLE_VOL_MIN_TICKS", "30"))
+
+# Per-asset ring buffers of recent prices; the "memory" behind every risk decision
+volatility_engine = VolatilityEngine(
+    capacity=VOL_WINDOW_TICKS,
+    ewma_lambda=VOL_EWMA_LAMBDA,
+    min_ticks=VOL_MIN_TICKS,
+)
+
+# `last_updated` of the quote behind each asset's latest tick
+_last_tick_quote = {}
+
+def _record_tick(asset: str, row: dict):
+    """A quote CoinGecko has updated since the asset's previous tick becomes one new tick."""
+    if not row or not row.get("current_price"):
+        return
+    updated = row.get("last_updated")
+    if updated is not None and _last_tick_quote.get(asset) == updated:
+        return  # the same quote again would feed a zero return and fake calm
+    _last_tick_quote[asset] = updated
+    volatility_engine.update(asset, row["current_price"])
+
+# --- RISK STREAM CONFIGURATION ---
+# Assets the background poller always watches (subscribers can add more)
+WATCH_ASSETS = {a.strip().lower() for a in os.getenv("ORACLE_WATCH_ASSETS", "neo").split(",") if a.strip()}
+POLL_INTERVAL_SECONDS = float(os.getenv("ORACLE_POLL_INTERVAL", str(MARKET_TTL_SECONDS)))
+STREAM_VOLATILITY_DELTA = float(os.getenv("ORACLE_STREAM_VOL_DELTA", "0.05"))
+STREAM_HEARTBEAT_SECONDS = 15.0
+
+# Fan-out of risk changes to SSE subscribers
+risk_stream = RiskBroadcaster(volatility_delta=STREAM_VOLATILITY_DELTA)
+# The poller's reports only, for consumers that act on them (the Executor's auto-hedge in main.py):
+# a per-request /market-risk call must never be able to trigger a hedge
+poller_stream = RiskBroadcaster(volatility_delta=STREAM_VOLATILITY_DELTA)
+
+# Shared async client: pooled connection, coalesced requests, TTL cache
+market_data = MarketDataClient(
+    url=MARKETS_URL,
+    ttl=MARKET_TTL_SECONDS,
+    stale_ttl=MARKET_STALE_SECONDS,
+    timeout=MARKET_TIMEOUT_SECONDS,
+)
+
+# Keep-alive session for the synchronous path (scripts / smoke tests), created on first use
+_http_session = None
 
 # --- 1. Define the Data Model (The "Note" passed between agents) ---
 class MarketRiskReport(BaseModel):
@@ -13,19 +92,150 @@ class MarketRiskReport(BaseModel):
     risk_level: str  # "LOW", "MEDIUM", "CRITICAL"
     recommendation: str # "HOLD" or "HEDGE_NOW"
     volatility: float # Volatility percentage
+    # What `volatility` measures: "24h_range" (high/low swing) or "rolling" (EWMA over the window)
+    volatility_basis: str = "24h_range"
 
 # --- 2. Define the Tool (The Logic) ---
 # This is the specific skill Agent A possesses.
-def fetch_market_risk(asset_symbol: str = "neo", force_trigger: bool = False) -> MarketRiskReport:
+def assess_market_risk(asset_symbol: str, data: dict, force_trigger: bool = False) -> MarketRiskReport:
     """
-    Fetches real-time market data and calculates a 'Risk Score' 
+    Calculates a 'Risk Score' from a CoinGecko market row
     based on volatility (Price Drawdown & Intraday Swing).
     """
-    print(f"👁️  Oracle watching: Checking {asset_symbol} price...")
-    
+    # Parse Data
+    price = data['current_price']
+    high_24h = data['high_24h']
+    low_24h = data['low_24h']
+    change_24h = data['price_change_percentage_24h']
+
+    # --- ROBUST VOLATILITY LOGIC ---
+    state = volatility_engine.ready(asset_symbol)
+    if state is not None:
+        # Precomputed rolling state: drawdown from the window high + EWMA volatility
+        drawdown_pct = state.drawdown_pct
+        volatility_pct = state.ewma_volatility_pct
+    else:
+        # Warm-up fallback: 24h snapshot heuristic
+        # 1. Drawdown from 24h High: How much has it crashed today?
+        drawdown_pct = ((high_24h - price) / high_24h) * 100
+
+        # 2. Intraday Volatility: Total swing range relative to current price
+        volatility_pct = ((high_24h - low_24h) / price) * 100
+
+    log.info(
+        f"📊 Analysis for {asset_symbol.upper()}: price ${price}, drawdown {drawdown_pct:.2f}%, volatility {volatility_pct:.2f}%",
+        extra={
+            "asset": asset_symbol,
+            "source": "rolling" if state else "24h snapshot",
+            "price": price,
+            "change_24h_pct": change_24h,
+            "drawdown_pct": drawdown_pct,
+            "volatility_pct": volatility_pct,
+        },
+    )
+
+    # DEMO MODE: Lower thresholds to always trigger hedge for demonstration
+    # Logic: If we are down significantly from the top OR volatility is extreme
+    # (the same rule as the batch path and the backtest, see risk_rules.classify)
+    code = CRITICAL if force_trigger else int(classify(drawdown_pct, volatility_pct))
+    risk = str(RISK_LEVELS[code])
+    rec = "HEDGE_NOW" if code != LOW else "HOLD"  # MEDIUM hedges too (demo)
+
+    return MarketRiskReport(
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        asset=asset_symbol,
+        current_price=price,
+        risk_level=risk,
+        recommendation=rec,
+        volatility=volatility_pct,
+        volatility_basis="rolling" if state else "24h_range"
+    )
+
+
+def assess_market_risk_batch(asset_symbols: list, rows: dict, force_trigger: bool = False) -> list:
+    """
+    Vectorized `assess_market_risk`: drawdown and volatility for every asset at once.
+    Assets without a usable market row come back as ERROR reports.
+    """
+    def column(field):
+        return np.array(
+            [(rows.get(a) or {}).get(field) for a in asset_symbols], dtype=np.float64
+        )
+
+    price = column("current_price")
+    high_24h = column("high_24h")
+    low_24h = column("low_24h")
+
+    drawdown_pct, volatility_pct = snapshot_metrics(price, high_24h, low_24h)
+
+    # Assets with warm rolling state use it instead of the 24h snapshot
+    rolling = np.zeros(len(asset_symbols), dtype=bool)
+    for i, asset in enumerate(asset_symbols):
+        state = volatility_engine.ready(asset)
+        if state is not None:
+            rolling[i] = True
+            drawdown_pct[i] = state.drawdown_pct
+            volatility_pct[i] = state.ewma_volatility_pct
+
+    valid = np.isfinite(drawdown_pct) & np.isfinite(volatility_pct) & (price > 0)
+    codes = classify(drawdown_pct, volatility_pct)
+    if force_trigger:
+        codes[:] = CRITICAL
+    critical = valid & (codes == CRITICAL)
+    medium = valid & (codes == MEDIUM)
+    risk = np.where(valid, RISK_LEVELS[codes], "ERROR")
+
+    log.info(
+        f"📊 Batch analysis for {len(asset_symbols)} assets: "
+        f"{int(critical.sum())} CRITICAL, {int(medium.sum())} MEDIUM, {int((~valid).sum())} ERROR",
+        extra={
+            "assets": len(asset_symbols),
+            "critical": int(critical.sum()),
+            "medium": int(medium.sum()),
+            "errors": int((~valid).sum()),
+        },
+    )
+
+    timestamp = datetime.now(timezone.utc).isoformat()
+    reports = []
+    for i, asset in enumerate(asset_symbols):
+        if not valid[i]:
+            reports.append(_error_report(asset))
+            continue
+        reports.append(MarketRiskReport(
+            timestamp=timestamp,
+            asset=asset,
+            current_price=float(price[i]),
+            risk_level=str(risk[i]),
+            # MEDIUM hedges too (demo mode), see assess_market_risk
+            recommendation="HEDGE_NOW" if risk[i] != "LOW" else "HOLD",
+            volatility=float(volatility_pct[i]),
+            volatility_basis="rolling" if rolling[i] else "24h_range"
+        ))
+    return reports
+
+
+def _error_report(asset_symbol: str) -> MarketRiskReport:
+    return MarketRiskReport(
+        timestamp="", asset=asset_symbol, current_price=0.0,
+        risk_level="ERROR", recommendation="HOLD", volatility=0.0
+    )
+
+
+def fetch_market_risk(asset_symbol: str = "neo", force_trigger: bool = False) -> MarketRiskReport:
+    """
+    Fetches real-time market data and calculates a 'Risk Score'.
+    Blocking version for scripts; the HTTP server uses `fetch_market_risk_async`.
+    """
+    global _http_session
+    log.info(f"👁️  Oracle watching: Checking {asset_symbol} price...", extra={"asset": asset_symbol})
+
     try:
+        if _http_session is None:
+            import requests
+            _http_session = requests.Session()
+
         # Using CoinGecko Markets API for richer data (High/Low/Vol)
-        url = "https://api.coingecko.com/api/v3/coins/markets"
         params = {
             "vs_currency": "usd",
             "ids": asset_symbol,
@@ -34,102 +244,141 @@ def fetch_market_risk(asset_symbol: str = "neo", force_trigger: bool = False) ->
             "page": 1,
             "sparkline": "false"
         }
-        response = requests.get(url, params=params).json()
-        
+        with COINGECKO_LATENCY.time():
+            response = _http_session.get(
+                MARKETS_URL, params=params, timeout=MARKET_TIMEOUT_SECONDS
+            ).json()
+
         if not response:
             raise ValueError(f"Asset '{asset_symbol}' not found.")
 
-        data = response[0]
-        
-        # Parse Data
-        price = data['current_price']
-        high_24h = data['high_24h']
-        low_24h = data['low_24h']
-        change_24h = data['price_change_percentage_24h']
-        
-        # --- ROBUST VOLATILITY LOGIC ---
-        # 1. Drawdown from 24h High: How much has it crashed today?
-        drawdown_pct = ((high_24h - price) / high_24h) * 100
-        
-        # 2. Intraday Volatility: Total swing range relative to current price
-        volatility_pct = ((high_24h - low_24h) / price) * 100
-        
-        print(f"📊 Analysis for {asset_symbol.upper()}:")
-        print(f"   Price: ${price}")
-        print(f"   24h Change: {change_24h:.2f}%")
-        print(f"   Drawdown from High: {drawdown_pct:.2f}%")
-        print(f"   Intraday Volatility: {volatility_pct:.2f}%")
-
-        risk = "LOW"
-        rec = "HOLD"
-        
-        # DEMO MODE: Lower thresholds to always trigger hedge for demonstration
-        # Logic: If we are down significantly from the top OR volatility is extreme
-        if force_trigger or (drawdown_pct > 0.1) or (volatility_pct > 0.1):  # Very low thresholds for demo
-            risk = "CRITICAL"
-            rec = "HEDGE_NOW"
-        elif (drawdown_pct > 0.005) or (volatility_pct > 0.005):
-            risk = "MEDIUM"
-            rec = "HEDGE_NOW"  # Changed from HOLD to HEDGE_NOW for demo
-        
-        from datetime import datetime, timezone
-        
-        return MarketRiskReport(
-            timestamp=datetime.now(timezone.utc).isoformat(),
-            asset=asset_symbol,
-            current_price=price,
-            risk_level=risk,
-            recommendation=rec,
-            volatility=volatility_pct
-        )
+        return assess_market_risk(asset_symbol, response[0], force_trigger)
 
     except Exception as e:
-        print(f"Error fetching data: {e}")
-        return MarketRiskReport(
-            timestamp="", asset=asset_symbol, current_price=0.0, 
-            risk_level="ERROR", recommendation="HOLD", volatility=0.0
-        )
+        ERRORS.inc(component="market_risk")
+        log.warning(f"Error fetching data: {e}", extra={"asset": asset_symbol})
+        return _error_report(asset_symbol)
 
 
-# --- 3. Define the Tool using SpoonOS SDK ---
-class MarketRiskTool(BaseTool):
-    name: str = "check_market_risk"
-    description: str = "Fetches real-time market data and calculates risk score based on volatility"
-    parameters: dict = {
-        "type": "object",
-        "properties": {
-            "asset_symbol": {
-                "type": "string",
-                "description": "The cryptocurrency symbol to check (e.g., 'neo')"
-            },
-            "force_trigger": {
-                "type": "boolean",
-                "description": "Set to True to force a CRITICAL risk level (for demos)",
-                "default": False
-            }
-        },
-        "required": ["asset_symbol"]
-    }
-    
-    async def execute(self, asset_symbol: str = "neo", force_trigger: bool = False) -> dict:
-        """Execute the market risk check"""
-        report = fetch_market_risk(asset_symbol, force_trigger)
-        return report.model_dump()
-
-# --- 4. Define the Agent using SpoonOS SDK ---
-class OracleAgent(ToolCallAgent):
-    name: str = "The Watchtower"
-    description: str = "Monitors market volatility and signals when to hedge"
-    system_prompt: str = "You are an oracle agent that monitors cryptocurrency markets and alerts when hedging is needed."
-    max_steps: int = 5
-    available_tools: ToolManager = Field(
-        default_factory=lambda: ToolManager([MarketRiskTool()])
-    )
-    
+async def fetch_market_risk_async(asset_symbol: str = "neo", force_trigger: bool = False) -> MarketRiskReport:
+    """
+    Non-blocking version of `fetch_market_risk`.
+    Served from the shared TTL cache; concurrent callers share one upstream request.
+    """
+    log.info(f"👁️  Oracle watching: Checking {asset_symbol} price...", extra={"asset": asset_symbol})
+
+    try:
+        data = await market_data.get_market(asset_symbol)
+        return assess_market_risk(asset_symbol, data, force_trigger)
+
+    except Exception as e:
+        ERRORS.inc(component="market_risk")
+        log.warning(f"Error fetching data: {e}", extra={"asset": asset_symbol})
+        return _error_report(asset_symbol)
+
+
+async def fetch_market_risk_batch(asset_symbols: list, force_trigger: bool = False, max_age: float = None) -> list:
+    """
+    Risk reports for many assets, fetched with a single paginated `coins/markets` query.
+    Returns one MarketRiskReport per requested symbol, in request order.
+    `max_age` forces a refetch of quotes older than that many seconds.
+    """
+    if isinstance(asset_symbols, str):
+        # "neo,bitcoin" from a tool call, not a list of characters
+        asset_symbols = asset_symbols.split(",")
+    symbols =[s.strip().lower() for s in asset_symbols if s and s.strip()]
+    log.info(f"👁️  Oracle watching: Checking {len(symbols)} assets...", extra={"assets": len(symbols)})
+
+    try:
+        rows = await market_data.get_markets(symbols, max_age=max_age)
+    except Exception as e:
+        ERRORS.inc(component="market_risk")
+        log.warning(f"Error fetching data: {e}", extra={"assets": len(symbols)})
+        return [_error_report(s) for s in symbols]
+
+    return assess_market_risk_batch(symbols, rows, force_trigger)
+
+
+# --- 3. SpoonOS SDK tools + agent (MarketRiskTool, BatchMarketRiskTool, OracleAgent) ---
+# Defined in agents/oracle_sdk.py and imported on first access: the endpoints never use them
+_SDK_NAMES = {"MarketRiskTool", "BatchMarketRiskTool", "OracleAgent"}
+
+def __getattr__(name):
+    if name in _SDK_NAMES:
+        from agents import oracle_sdk
+        return getattr(oracle_sdk, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 from fastapi import FastAPI
 import uvicorn
 
-app = FastAPI(title="The Watchtower")
+# Last risk level seen per asset, to count LOW -> MEDIUM -> CRITICAL transitions
+_risk_levels = {}
+
+def publish_reports(reports: list):
+    """Push reports to stream subscribers (only meaningful changes go out) and count level changes."""
+    for report in reports:
+        if report.risk_level != "ERROR":
+            asset = report.asset.lower()
+            previous = _risk_levels.get(asset)
+            if previous is not None and previous != report.risk_level:
+                RISK_TRANSITIONS.inc(asset=asset, from_level=previous, to_level=report.risk_level)
+            _risk_levels[asset] = report.risk_level
+
+        if risk_stream.publish(report.model_dump()) and report.risk_level == "CRITICAL":
+            log.warning(
+                f"🚨 CRITICAL risk pushed for {report.asset.upper()} to {risk_stream.subscriber_count} subscribers",
+                extra={"asset": report.asset, "subscribers": risk_stream.subscriber_count},
+            )
+
+
+async def poll_once():
+    """One poller cycle: one batched upstream query for every watched asset."""
+    assets = sorted(WATCH_ASSETS | risk_stream.watched_assets)
+    if not assets:
+        return
+    # Half an interval of slack so each cycle sees a fresh quote, not a stale one
+    rows = await market_data.get_markets(assets, max_age=POLL_INTERVAL_SECONDS / 2)
+    # The only source of ticks: the volatility window advances at the poller's cadence,
+    # however many /market-risk requests hit the cache in between
+    for asset in assets:
+        _record_tick(asset, rows.get(asset))
+    reports = assess_market_risk_batch(assets, rows)
+    publish_reports(reports)
+    for report in reports:
+        poller_stream.publish(report.model_dump())
+
+
+async def poll_watched_assets():
+    """
+    Background poller: one batched upstream query per interval for every watched asset,
+    no matter how many clients are listening.
+    """
+    while True:
+        try:
+            await poll_once()
+        except Exception as e:
+            ERRORS.inc(component="poller")
+            log.warning(f"⚠️  Poller error: {e}")
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start = time.perf_counter()
+    poller = asyncio.create_task(poll_watched_assets())
+    log.info(f"📡 Risk poller watching {sorted(WATCH_ASSETS)} every {POLL_INTERVAL_SECONDS}s")
+    startup_ms = (time.perf_counter() - start) * 1000
+    log.info(
+        f"🚀 Oracle ready: imports {IMPORT_SECONDS * 1000:.0f} ms, startup {startup_ms:.0f} ms",
+        extra={"import_ms": round(IMPORT_SECONDS * 1000, 1), "startup_ms": round(startup_ms, 1)},
+    )
+    yield
+    poller.cancel()
+    # Release the pooled CoinGecko connection on shutdown
+    await market_data.aclose()
+
+app = FastAPI(title="The Watchtower", lifespan=lifespan)
 
 # Add CORS middleware to allow browser requests
 from fastapi.middleware.cors import CORSMiddleware
@@ -145,8 +394,10 @@ class RiskRequest(BaseModel):
     asset_symbol: str = "neo"
 
 from fastapi import Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
 @app.post("/market-risk")
+@metrics.timed(HTTP_LATENCY, endpoint="/market-risk")
 async def check_market_risk(request: Request):
     """Expose the market risk tool via HTTP"""
     try:
@@ -155,7 +406,7 @@ async def check_market_risk(request: Request):
         # 1. Try to get JSON body
         try:
             body = await request.json()
-            print(f"\n🔍 DEBUG: Received Request Body: {body}")
+            log.debug(f"🔍 Received Request Body: {body}")
             if body and "asset_symbol" in body:
                 symbol = body["asset_symbol"]
         except Exception:
@@ -163,16 +414,106 @@ async def check_market_risk(request: Request):
             
         # 2. If not in body, check query params
         if symbol == "neo" and request.query_params.get("asset_symbol"):
-            print(f"\n🔍 DEBUG: Received Query Params: {request.query_params}")
+            log.debug(f"🔍 Received Query Params: {request.query_params}")
             symbol = request.query_params["asset_symbol"]
 
-        print(f"✅ Processing request for: {symbol}")
-        return fetch_market_risk(symbol)
+        log.info(f"✅ Processing request for: {symbol}", extra={"asset": symbol})
+        report = await fetch_market_risk_async(symbol)
+        publish_reports([report])
+        return report
 
     except Exception as e:
-        print(f"❌ Error parsing request: {e}")
+        ERRORS.inc(component="http")
+        log.error(f"❌ Error parsing request: {e}")
         return {"error": str(e)}
 
+@app.post("/market-risk/batch")
+@metrics.timed(HTTP_LATENCY, endpoint="/market-risk/batch")
+async def check_market_risk_batch(request: Request):
+    """Expose the batch market risk tool via HTTP"""
+    try:
+        symbols = []
+
+        # 1. Try to get JSON body: {"asset_symbols": ["neo", "bitcoin"]} or {"asset_symbols": "neo,bitcoin"}
+        body = None
+        try:
+            body = await request.json()
+        except Exception:
+            pass
+        if isinstance(body, dict) and "asset_symbols" in body:
+            value = body["asset_symbols"]
+            if isinstance(value, str):
+                symbols = value.split(",")
+            elif isinstance(value, list) and all(isinstance(s, str) for s in value):
+                symbols = value
+            else:
+                return {"error": "asset_symbols must be a list of strings or a comma-separated string"}
+
+        # 2. If not in body, check query params: ?asset_symbols=neo,bitcoin
+        if not symbols and request.query_params.get("asset_symbols"):
+            symbols = request.query_params["asset_symbols"].split(",")
+
+        symbols = [s.strip() for s in symbols if s.strip()]
+        if not symbols:
+            return {"error": "asset_symbols is required"}
+
+        log.info(f"✅ Processing batch request for {len(symbols)} assets", extra={"assets": len(symbols)})
+        reports = await fetch_market_risk_batch(symbols)
+        publish_reports(reports)
+        return reports
+
+    except Exception as e:
+        ERRORS.inc(component="http")
+        log.error(f"❌ Error parsing request: {e}")
+        return {"error": str(e)}
+
+@app.get("/market-risk/stream")
+async def stream_market_risk(request: Request):
+    """
+    Server-Sent Events stream of risk changes.
+    Optional filter: ?asset_symbols=neo,bitcoin (these assets join the poller's watch list).
+    """
+    assets = {a.strip().lower() for a in request.query_params.get("asset_symbols", "").split(",") if a.strip()}
+    sub = risk_stream.subscribe(assets or None)
+    log.info(f"📡 Stream subscriber connected ({risk_stream.subscriber_count} total)")
+
+    async def events():
+        try:
+            # Start with the latest known state, then push changes only
+            for report in risk_stream.latest(assets or None):
+                yield format_sse(report)
+            while True:
+                try:
+                    report = await asyncio.wait_for(sub.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(report)
+        finally:
+            risk_stream.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/volatility/{asset_symbol}")
+async def get_volatility(asset_symbol: str):
+    """Rolling volatility state for one asset (memory lookup, no upstream call)"""
+    state = volatility_engine.get(asset_symbol)
+    if state is None:
+        return {"error": f"No ticks recorded for '{asset_symbol}' yet"}
+    return {"asset": asset_symbol, "ready": state.ticks >= VOL_MIN_TICKS, **state.snapshot()}
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics (text exposition format)"""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# Module load time (imports + setup), reported at startup
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
 # To run the agent and expose the API:
 if __name__ == "__main__":
     # Start the HTTP server so n8n can call it
@@ -1,128 +1,250 @@
+import asyncio
+import os
+import sys
+import time
+
+_import_started = time.perf_counter()
+
+# Make `agents.*` importable both as a script (python3 agents/agentb.py) and as a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings come from the environment; a .env file (see README) fills in whatever is unset
+from dotenv import load_dotenv
+load_dotenv()
+
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from pydantic import BaseModel, Field
-from spoon_ai.tools.base import BaseTool
-from spoon_ai.agents import ToolCallAgent
-from spoon_ai.tools import ToolManager
-from spoon_ai.llm.base import LLMBase
-from spoon_ai.schema import LLMResponse
-
-# NEO N3 IMPORTS
-from neo3.wallet.account import Account
-from neo3.api.wrappers import GasToken, ChainFacade
-from neo3.network.payloads.verification import WitnessScope
-from neo3.api.helpers.signing import sign_with_account
-from neo3.network.payloads.verification import Signer
-import httpx
-
-# --- 1. DEFINE THE HEDGE TOOL ---
-class HedgeTool(BaseTool):
-    name: str = "execute_hedge"
-    description: str = "Hedges the specified USD amount by performing a REAL transaction on Neo N3."
-    parameters: dict = {
-        "type": "object",
-        "properties": {
-            "amount_usd": {
-                "type": "number",
-                "description": "The dollar value to hedge (e.g. 5000.0)"
-            }
-        },
-        "required": ["amount_usd"]
-    }
-
-    async def execute(self, amount_usd: float) -> dict:
-        """Execute the hedge transaction"""
-        # --- CONFIGURATION ---
-        # Your specific WIF (TestNet Wallet)
-        WIF = "Kz63tuUgq54jWyZ14h8pZQq6kDU7fXidxLipp4QUFvYKfPGYLeUS"
-        RPC_URL = "http://seed1t5.neo.org:20332"
-
-        print(f"🤖 AGENT WAKING UP: Initiating Hedge for ${amount_usd}...")
-
-      # Rule: 1 USD = 10^-8 GAS (which is exactly 1 integer Unit)
-        # Fix: 10,000 USD becomes 10,000 units.
-        units_to_move = int(amount_usd)
-        
-        # Calculate human-readable value for the Dashboard (e.g. 0.0001 GAS)
-        # 1 GAS = 100,000,000 units
-        human_readable_gas = units_to_move / 100_000_000
+from fastapi.responses import JSONResponse, PlainTextResponse
+from typing import Optional
 
-        try:
-            # A. Connect to Neo N3 Node
-            facade = ChainFacade(RPC_URL)
-            account = Account.from_wif(WIF)
-            print(f"✅ Wallet Authenticated: {account.address}")
-
-            # B. Fetch Block Height (Critical for Dashboard)
-            # We fetch this LIVE so the UI doesn't say "undefined"
-            # block_height = await facade.rpc.get_block_count()
-            async with httpx.AsyncClient() as client:
-                resp = await client.post(RPC_URL, json={
-                    "jsonrpc": "2.0",
-                    "method": "getblockcount",
-                    "params": [],
-                    "id": 1
-                })
-                block_height = resp.json()["result"]
-
-            # C. Create Self-Transfer (The "Hedge" Action)
-            gas_token = GasToken()
-            transfer_call = gas_token.transfer(
-                source=account.script_hash,
-                destination=account.script_hash,
-                amount=units_to_move,
-                data=None
-            )
+# NEO N3 SESSION (pooled RPC, decoded wallet, prebuilt signer, block watcher; neo3 loads on start)
+from agents.chain_session import ChainSession
+from agents.hedge_batcher import HedgeBatcher
+from agents.hedge_jobs import HedgeJobQueue, QueueFullError
+from agents.confirmations import ConfirmationTracker
+from agents.hedge_ledger import HedgeLedger
+from agents.logs import get_logger
+from agents import metrics
+from agents.metrics import ERRORS, HTTP_LATENCY
 
-            print("🔄 Constructing and Signing Transaction...")
+log = get_logger("executor")
 
-            # D. Sign & Broadcast
-            signer = Signer(account.script_hash, WitnessScope.CALLED_BY_ENTRY)
-            signing_function = sign_with_account(account)
-            signing_pair = (signing_function, signer)
-            
-            tx_hash = await facade.invoke_fast(transfer_call, signers=[signing_pair])
-            
-            print(f"🚀 TRANSACTION SENT! Hash: {tx_hash}")
-            
-            # E. RETURN RICH DATA (For Dashboard)
-            return {
+# --- CONFIGURATION ---
+# Your specific WIF (TestNet Wallet)
+WIF = os.getenv("NEO_WALLET_PRIVATE_KEY", "Kz63tuUgq54jWyZ14h8pZQq6kDU7fXidxLipp4QUFvYKfPGYLeUS")
+RPC_URL = os.getenv("NEO_RPC_URL", "http://seed1t5.neo.org:20332")
+BLOCK_POLL_SECONDS = float(os.getenv("NEO_BLOCK_POLL_INTERVAL", "2"))
+
+# One session for the whole process, started with the app
+chain_session = ChainSession(RPC_URL, WIF, block_poll_interval=BLOCK_POLL_SECONDS)
+
+# Append-only SQLite (WAL) record of every hedge and how its transaction settled
+LEDGER_PATH = os.getenv("HEDGE_LEDGER_PATH", "hedges.db")
+hedge_ledger = HedgeLedger(LEDGER_PATH)
+
+# Watches broadcast hedges until they land; one JSON-RPC batch per block for all of them
+confirmations = ConfirmationTracker(chain_session, on_update=hedge_ledger.record_confirmation)
+
+# --- BATCHING MODE ---
+# HEDGE_BATCH_WINDOW_MS > 0 combines hedges arriving within the window into one transaction
+BATCH_WINDOW_MS = float(os.getenv("HEDGE_BATCH_WINDOW_MS", "0"))
+BATCH_MAX_SIZE = int(os.getenv("HEDGE_BATCH_MAX_SIZE", "50"))
+hedge_batcher = (
+    HedgeBatcher(chain_session, window=BATCH_WINDOW_MS / 1000, max_size=BATCH_MAX_SIZE)
+    if BATCH_WINDOW_MS > 0 else None
+)
+
+# --- 1. THE HEDGE (plain coroutine: the serving path never imports the SDK) ---
+async def execute_hedge(amount_usd: float, idempotency_key: Optional[str] = None) -> dict:
+    """Execute the hedge transaction (`idempotency_key` is recorded with it in the ledger)"""
+    log.info(f"🤖 AGENT WAKING UP: Initiating Hedge for ${amount_usd}...", extra={"amount_usd": amount_usd})
+
+    # Rule: 1 USD = 10^-8 GAS (which is exactly 1 integer Unit)
+    # Fix: 10,000 USD becomes 10,000 units.
+    units_to_move = int(amount_usd)
+    
+    # Calculate human-readable value for the Dashboard (e.g. 0.0001 GAS)
+    # 1 GAS = 100,000,000 units
+    human_readable_gas = units_to_move / 100_000_000
+
+    try:
+        if hedge_batcher is not None:
+            # Batching mode: share one transaction with the other hedges in this window
+            batch = await hedge_batcher.submit(units_to_move)
+            log.info(
+                f"🚀 TRANSACTION SENT! Hash: {batch['tx_hash']} (batch of {batch['batch_size']})",
+                extra={"tx_hash": batch["tx_hash"], "batch_size": batch["batch_size"], "units": units_to_move},
+            )
+            confirmations.track(batch["tx_hash"], batch["block_height"])
+            result = {
                 "status": "SUCCESS",
-                "tx_hash": str(tx_hash),
-                "gas_locked": human_readable_gas,  # The exact calculation
-                "units_moved": units_to_move,
-                "block_height": block_height,      # Real block height
-                "wallet": account.address
+                "tx_hash": batch["tx_hash"],
+                "gas_locked": human_readable_gas,  # This caller's share
+                "units_moved": batch["units_moved"],
+                "block_height": batch["block_height"],
+                "wallet": batch["wallet"],
+                "batch_size": batch["batch_size"],
+                "confirmation": "PENDING"
             }
+            hedge_ledger.append(amount_usd, result, idempotency_key)
+            return result
 
-        except Exception as e:
-            print(f"⚠️ TRANSACTION ERROR: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return {
-                "status": "ERROR",
-                "error": str(e),
-                "gas_locked": 0,
-                "block_height": 0
-            }
+        # A. Reuse the Neo N3 session (connects on first use if startup could not)
+        session = chain_session
+        await session.start()
+        account = session.account
+
+        # B. Block Height (Critical for Dashboard)
+        # Kept current by the session's block watcher, so no RPC round trip here
+        block_height = session.block_height
+
+        # C. Create Self-Transfer (The "Hedge" Action)
+        transfer_call = session.gas_token.transfer(
+            source=account.script_hash,
+            destination=account.script_hash,
+            amount=units_to_move,
+            data=None
+        )
+
+        log.debug("🔄 Constructing and Signing Transaction...")
+
+        # D. Sign & Broadcast (prebuilt signing pair, pooled connection)
+        tx_hash = await session.invoke(transfer_call)
+        
+        log.info(f"🚀 TRANSACTION SENT! Hash: {tx_hash}", extra={"tx_hash": str(tx_hash), "units": units_to_move})
+        confirmations.track(str(tx_hash), block_height)
+        
+        # E. RETURN RICH DATA (For Dashboard)
+        result = {
+            "status": "SUCCESS",
+            "tx_hash": str(tx_hash),
+            "gas_locked": human_readable_gas,  # The exact calculation
+            "units_moved": units_to_move,
+            "block_height": block_height,      # Height at broadcast; see /hedge/tx for inclusion
+            "wallet": account.address,
+            "confirmation": "PENDING"
+        }
+        hedge_ledger.append(amount_usd, result, idempotency_key)
+        return result
+
+    except Exception as e:
+        ERRORS.inc(component="hedge")
+        log.exception(f"⚠️ TRANSACTION ERROR: {str(e)}", extra={"amount_usd": amount_usd})
+        result = {
+            "status": "ERROR",
+            "error": str(e),
+            "gas_locked": 0,
+            "block_height": 0
+        }
+        hedge_ledger.append(amount_usd, result, idempotency_key)
+        return result
+
+# --- 2. SpoonOS SDK tool + agent (HedgeTool, DummyLLM, ExecutionAgent) ---
+# Defined in agents/executor_sdk.py and imported on first access: the endpoints never use them
+_SDK_NAMES = {"HedgeTool", "DummyLLM", "ExecutionAgent"}
+
+def __getattr__(name):
+    if name in _SDK_NAMES:
+        from agents import executor_sdk
+        return getattr(executor_sdk, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# --- HEDGE JOB QUEUE ---
+# /hedge answers 202 immediately; a bounded worker pool runs the hedges
+# In batching mode every worker waits on its batch, so default to one worker per batch slot
+HEDGE_WORKERS = int(os.getenv("HEDGE_WORKERS", str(BATCH_MAX_SIZE if hedge_batcher else 4)))
+HEDGE_QUEUE_SIZE = int(os.getenv("HEDGE_QUEUE_SIZE", "100"))
+# Hosts `callback_url` may point to (comma-separated); callbacks are refused when empty
+CALLBACK_HOSTS = frozenset(h.strip().lower() for h in os.getenv("HEDGE_CALLBACK_HOSTS", "").split(",") if h.strip())
+hedge_jobs = HedgeJobQueue(
+    execute_hedge,
+    workers=HEDGE_WORKERS,
+    max_pending=HEDGE_QUEUE_SIZE,
+    store=hedge_ledger,  # jobs and idempotency keys survive restarts
+    callback_hosts=CALLBACK_HOSTS,
+)
+
+# --- RISK SIGNALS ---
+# Oracle reports pushed in-process by the orchestrator (main.py), latest per asset
+risk_signals = {}
+# HEDGE_ON_CRITICAL_USD > 0 queues a hedge of that size as soon as an asset turns CRITICAL
+AUTO_HEDGE_USD = float(os.getenv("HEDGE_ON_CRITICAL_USD", "0"))
+# ...but only for these assets (comma-separated), never for whatever a client asked the Oracle about
+AUTO_HEDGE_ASSETS = frozenset(
+    a.strip().lower()
+    for a in os.getenv("HEDGE_ON_CRITICAL_ASSETS", os.getenv("ORACLE_WATCH_ASSETS", "neo")).split(",")
+    if a.strip()
+)
+
+async def on_risk_signal(report: dict):
+    """Handle one pushed risk report; only a change into CRITICAL acts."""
+    asset = report["asset"].lower()
+    previous = risk_signals.get(asset)
+    risk_signals[asset] = report
+    if report["risk_level"] != "CRITICAL" or (previous and previous["risk_level"] == "CRITICAL"):
+        return
 
-# --- DUMMY LLM (Required for SpoonOS ToolCallAgent) ---
-class DummyLLM(LLMBase):
-    async def chat(self, messages, **kwargs): return LLMResponse(content="Dummy")
-    async def completion(self, prompt, **kwargs): return LLMResponse(content="Dummy")
-    async def chat_with_tools(self, messages, **kwargs): return LLMResponse(content="Dummy")
-
-# --- 2. DEFINE THE AGENT ---
-class ExecutionAgent(ToolCallAgent):
-    name: str = "Alice's Executioner (Agent B)"
-    description: str = "An autonomous agent that secures funds on the Neo Blockchain."
-    llm: LLMBase = Field(default_factory=lambda: DummyLLM())
-    available_tools: ToolManager = Field(
-        default_factory=lambda: ToolManager([HedgeTool()])
+    log.warning(
+        f"🚨 CRITICAL signal for {asset.upper()} received from the Oracle",
+        extra={"asset": asset, "volatility": report["volatility"]},
     )
+    if AUTO_HEDGE_USD <= 0 or asset not in AUTO_HEDGE_ASSETS:
+        return
+    try:
+        # Keyed on the report, so a replayed signal never hedges twice
+        job, created = await hedge_jobs.submit(AUTO_HEDGE_USD, f"critical:{asset}:{report['timestamp']}")
+    except QueueFullError as e:
+        ERRORS.inc(component="risk_signal")
+        log.warning(f"⏳ CRITICAL hedge for {asset.upper()} not queued: {e}", extra={"asset": asset})
+        return
+    if created:
+        log.info(f"✅ Queued CRITICAL hedge for: ${AUTO_HEDGE_USD} (job {job.job_id})",
+                 extra={"job_id": job.job_id, "amount_usd": AUTO_HEDGE_USD, "asset": asset})
 
 # --- 3. EXPOSE VIA FASTAPI ---
-app = FastAPI(title="Alice's Executioner")
+async def warm_up_chain_session():
+    start = time.perf_counter()
+    try:
+        await chain_session.start()
+        log.info(f"🔥 Chain session warmed up in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except Exception as e:
+        log.warning(f"⚠️ Chain session not ready at startup (will retry on first hedge): {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resume watching hedges that were broadcast but not settled before the last shutdown
+    start = time.perf_counter()
+    await hedge_ledger.start()
+    unconfirmed = await hedge_ledger.unconfirmed()
+    for tx_hash, block_height in unconfirmed:
+        confirmations.track(tx_hash, block_height)
+    requeued = await hedge_jobs.restore()
+    log.info(
+        f"📒 Hedge ledger {LEDGER_PATH}: {len(unconfirmed)} unconfirmed transactions and "
+        f"{requeued} queued hedges restored in {(time.perf_counter() - start) * 1000:.1f} ms",
+        extra={"unconfirmed": len(unconfirmed), "requeued": requeued},
+    )
+
+    # Warm the chain session (neo3 import, wallet, RPC) in the background: requests are
+    # accepted right away and the first hedge simply waits for the warm-up to finish
+    warm_up = asyncio.create_task(warm_up_chain_session())
+    hedge_jobs.start()
+    startup_ms = (time.perf_counter() - start) * 1000
+    log.info(
+        f"🚀 Executor ready: imports {IMPORT_SECONDS * 1000:.0f} ms, startup {startup_ms:.0f} ms",
+        extra={"import_ms": round(IMPORT_SECONDS * 1000, 1), "startup_ms": round(startup_ms, 1)},
+    )
+    yield
+    warm_up.cancel()
+    await hedge_jobs.close()
+    await confirmations.close()
+    if hedge_batcher is not None:
+        await hedge_batcher.close()
+    await hedge_ledger.close()
+    await chain_session.close()
+
+app = FastAPI(title="Alice's Executioner", lifespan=lifespan)
 
 # Enable CORS
 from fastapi.middleware.cors import CORSMiddleware
@@ -135,16 +257,26 @@ app.add_middleware(
 )
 
 @app.post("/hedge")
+@metrics.timed(HTTP_LATENCY, endpoint="/hedge")
 async def hedge_endpoint(request: Request):
-    """Expose the hedge tool via HTTP"""
+    """
+    Queue a hedge and return 202 right away.
+    Poll GET /hedge/jobs/{job_id} (or pass `callback_url`) for the result.
+    Send an `Idempotency-Key` header (or `idempotency_key` field) so retries never hedge twice.
+    """
     try:
         amount = 10.0 # Default
+        idempotency_key = request.headers.get("Idempotency-Key")
+        callback_url = None
         
         # Try JSON body
         try:
             body = await request.json()
             if body and "amount_usd" in body:
                 amount = float(body["amount_usd"])
+            if body:
+                idempotency_key = body.get("idempotency_key", idempotency_key)
+                callback_url = body.get("callback_url")
         except Exception:
             pass
             
@@ -152,19 +284,97 @@ async def hedge_endpoint(request: Request):
         if amount == 10.0 and request.query_params.get("amount_usd"):
             amount = float(request.query_params["amount_usd"])
 
-        print(f"✅ Processing hedge for: ${amount}")
-        
-        # Execute Tool
-        tool = HedgeTool()
-        result = await tool.execute(amount)
-        
-        # Return the result directly (it is now a dict, not a string)
-        return result
+        try:
+            job, created = await hedge_jobs.submit(amount, idempotency_key, callback_url)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"status": "ERROR", "error": str(e)})
+        except QueueFullError as e:
+            log.warning(f"⏳ Hedge queue full, rejecting ${amount}", extra={"amount_usd": amount})
+            return JSONResponse(
+                status_code=429,
+                content={"status": "ERROR", "error": str(e)},
+                headers={"Retry-After": "1"},
+            )
+
+        if created:
+            log.info(f"✅ Queued hedge for: ${amount} (job {job.job_id})", extra={"job_id": job.job_id, "amount_usd": amount})
+        else:
+            log.info(f"♻️ Duplicate hedge request, returning job {job.job_id}", extra={"job_id": job.job_id})
+
+        return JSONResponse(
+            status_code=202,
+            content={
+                **job.to_dict(),
+                "duplicate": not created,
+                "status_url": f"/hedge/jobs/{job.job_id}",
+            },
+        )
 
     except Exception as e:
-        print(f"❌ Error processing request: {e}")
+        ERRORS.inc(component="http")
+        log.error(f"❌ Error processing request: {e}")
         return {"status": "ERROR", "error": str(e)}
 
+@app.get("/hedge/jobs/{job_id}")
+async def hedge_job_status(job_id: str):
+    """Status of a queued hedge; `result` holds the HedgeTool output once finished"""
+    job = await hedge_jobs.find(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": "ERROR", "error": f"Unknown job '{job_id}'"})
+    data = job.to_dict()
+    if job.result and job.result.get("tx_hash"):
+        record = confirmations.get(job.result["tx_hash"])
+        if record is not None:
+            data["result"] = {**job.result, "confirmation": record.status, "confirmation_details": record.to_dict()}
+    return data
+
+@app.get("/hedge/tx/{tx_hash}")
+async def hedge_confirmation(tx_hash: str):
+    """On-chain confirmation of a hedge: real inclusion block, VM state and GAS consumed"""
+    record = confirmations.get(tx_hash)
+    if record is not None:
+        return record.to_dict()
+    # Settled before the last restart (or trimmed from memory): read it from the ledger
+    settled = await hedge_ledger.get_confirmation(tx_hash)
+    if settled is None:
+        return JSONResponse(status_code=404, content={"status": "ERROR", "error": f"Unknown transaction '{tx_hash}'"})
+    return settled
+
+@app.get("/hedges")
+async def list_hedges(limit: int = 100, cursor: Optional[int] = None, wallet: Optional[str] = None,
+                      status: Optional[str] = None, tx_hash: Optional[str] = None,
+                      since: Optional[float] = None, until: Optional[float] = None):
+    """
+    Hedge history from the ledger, newest first.
+    Pass `next_cursor` back as `cursor` for the next page. `since` / `until` are epoch seconds.
+    """
+    # Rows are plain JSON types already: skip FastAPI's per-field encoder (most of the cost for big pages)
+    return JSONResponse(await hedge_ledger.query(wallet, status, tx_hash, since, until, cursor, limit))
+
+@app.get("/hedges/summary")
+async def hedges_summary(wallet: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None):
+    """Totals: hedge count, USD / units / GAS locked, confirmation states, GAS consumed"""
+    return await hedge_ledger.summary(wallet, since, until)
+
+@app.get("/hedges/timeseries")
+async def hedges_timeseries(bucket: int = 3600, wallet: Optional[str] = None,
+                            since: Optional[float] = None, until: Optional[float] = None):
+    """Hedge count and volume per `bucket` seconds"""
+    return JSONResponse(await hedge_ledger.timeseries(bucket, wallet, since, until))
+
+@app.get("/risk-signals")
+async def get_risk_signals():
+    """Latest Oracle report per asset pushed to the executor (orchestrator mode only)"""
+    return risk_signals
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics (text exposition format)"""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+# Module load time (imports + setup), reported at startup
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
 if __name__ == "__main__":
-    print("🟢 SpoonOS Agent B Starting on Port 8000...")
+    log.info("🟢 SpoonOS Agent B Starting on Port 8000...")
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
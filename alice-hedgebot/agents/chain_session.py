@@ -0,0 +1,202 @@
+"""
+Long-lived Neo N3 chain session for the Executor agent.
+
+Built once at app startup instead of on every hedge:
+- one pooled RPC connection (NeoRpcClient keeps its aiohttp session open)
+- the decoded Account, a prebuilt Signer / signing pair and a reused GasToken wrapper
+- the network magic, fetched once
+- the block height, kept current by a background watcher so hedges read it from memory
+
+A hedge then costs invokescript + calculatenetworkfee + sendrawtransaction,
+with no getversion / getblockcount round trips and no key decoding on the critical path.
+Every RPC call is timed by method, and signing (CPU only) / broadcast time per hedge, for /metrics.
+
+neo-mamba (and aiohttp under it) is imported by `start()`, on a worker thread, not at module
+load: the Executor starts serving first and warms the session up in the background.
+"""
+import asyncio
+import inspect
+import random
+import secrets
+import time
+from typing import TYPE_CHECKING
+
+from agents.logs import get_logger
+from agents.metrics import ERRORS, RPC_LATENCY, TX_BROADCAST_LATENCY, TX_SIGN_LATENCY
+
+if TYPE_CHECKING:
+    from neo3.core import types
+
+log = get_logger("chain")
+
+# Bound by load_neo3()
+noderpc = txbuilder = sign_insecure_with_account = GasToken = Signer = WitnessScope = Account = None
+ScryptParameters = None
+
+
+def load_neo3() -> float:
+    """Import the neo-mamba modules the session needs. Returns the seconds it took (0 once loaded)."""
+    global noderpc, txbuilder, sign_insecure_with_account, GasToken, Signer, WitnessScope, Account
+    global ScryptParameters
+    if Account is not None:
+        return 0.0
+    start = time.perf_counter()
+    from neo3.api import noderpc
+    from neo3.api.helpers import txbuilder
+    from neo3.api.helpers.signing import sign_insecure_with_account
+    from neo3.api.wrappers import GasToken
+    from neo3.network.payloads.verification import Signer, WitnessScope
+    from neo3.wallet.account import Account
+    from neo3.wallet.scrypt_parameters import ScryptParameters
+    return time.perf_counter() - start
+
+
+def instrument(rpc):
+    """
+    Record latency and errors of every call made through `rpc`, by JSON-RPC method.
+    Every typed helper (get_block_count, send_transaction, ... and TxBuilder's fee calls) goes
+    through the private `_do_post`; if a neo-mamba upgrade drops it, this says so loudly at
+    session start and leaves the client unwrapped instead of breaking hedges.
+    """
+    do_post = getattr(rpc, "_do_post", None)
+    if not inspect.iscoroutinefunction(do_post):
+        ERRORS.inc(component="neo_rpc_metrics")
+        log.error(
+            f"❌ {type(rpc).__name__}._do_post not found (neo-mamba API changed?): "
+            f"Neo RPC calls are NOT timed, {RPC_LATENCY.name} stays empty"
+        )
+        return rpc
+
+    async def timed_post(method: str, *args, **kwargs):
+        try:
+            with RPC_LATENCY.time(method=method):
+                return await do_post(method, *args, **kwargs)
+        except Exception:
+            ERRORS.inc(component="neo_rpc")
+            raise
+
+    rpc._do_post = timed_post
+    return rpc
+
+
+class ChainSession:
+    def __init__(
+        self,
+        rpc_url: str,
+        wif: str,
+        block_poll_interval: float = 2.0,
+        rpc_timeout: float = 10.0,
+        valid_for_blocks: int = 1500,
+    ):
+        """
+        Args:
+            rpc_url: Neo N3 RPC node.
+            wif: wallet key used to sign hedges.
+            block_poll_interval: seconds between block height refreshes.
+            rpc_timeout: total seconds an RPC request may take.
+            valid_for_blocks: how long a transaction stays valid in the mempool (~6h at 15s blocks).
+        """
+        self.rpc_url = rpc_url
+        self.wif = wif
+        self.block_poll_interval = block_poll_interval
+        self.rpc_timeout = rpc_timeout
+        self.valid_for_blocks = valid_for_blocks
+
+        self.rpc = None
+        self.account = None
+        self.signer = None
+        self.signing_pair = None
+        self.gas_token = None
+        self.network = -1
+        self.block_height = 0
+        self._watcher = None
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self.rpc is not None
+
+    async def start(self):
+        """Connect, decode the wallet and start the block watcher. Safe to call repeatedly."""
+        async with self._start_lock:
+            if self.started:
+                return
+
+            # Off the event loop: the import is pure CPU work
+            import_seconds = await asyncio.to_thread(load_neo3)
+            if import_seconds:
+                log.info(f"📦 neo3 loaded in {import_seconds * 1000:.0f} ms", extra={"import_ms": round(import_seconds * 1000, 1)})
+
+            # Key decoding and signer setup happen once, not per hedge.
+            # neo-mamba keeps the key encrypted and decrypts it on every signature. The password
+            # never leaves this process (the WIF is in memory anyway), so it is random and the
+            # scrypt cost minimal: the default parameters add ~0.5 s of CPU to each hedge.
+            password = secrets.token_urlsafe(16)
+            self.account = Account.from_wif(self.wif, password, _scrypt_parameters=ScryptParameters(2, 1, 1))
+            self.signer = Signer(self.account.script_hash, WitnessScope.CALLED_BY_ENTRY)
+            self.signing_pair = (sign_insecure_with_account(self.account, password), self.signer)
+            self.gas_token = GasToken()
+
+            rpc = instrument(noderpc.NeoRpcClient(self.rpc_url, timeout=self.rpc_timeout))
+            try:
+                version = await rpc.get_version()
+                self.network = version.protocol.network
+                self.block_height = await rpc.get_block_count()
+            except Exception:
+                await rpc.close()
+                raise
+
+            self.rpc = rpc
+            self._watcher = asyncio.create_task(self._watch_blocks())
+            log.info(
+                f"✅ Chain session ready: {self.account.address} @ block #{self.block_height}",
+                extra={"wallet": self.account.address, "block_height": self.block_height},
+            )
+
+    async def _watch_blocks(self):
+        while True:
+            await asyncio.sleep(self.block_poll_interval)
+            try:
+                self.block_height = await self.rpc.get_block_count()
+            except Exception as e:
+                log.warning(f"⚠️  Block watcher error: {e}")
+
+    async def invoke(self, call) -> "types.UInt256":
+        """
+        Sign and broadcast `call` (a ContractMethodResult) over the pooled connection.
+        Same steps as ChainFacade.invoke_fast, minus the per-call session and lookups.
+        """
+        await self.start()
+
+        builder = txbuilder.TxBuilder(self.rpc, call.script)
+        builder.network = self.network
+        # TxBuilder's fixed nonce would make equal hedges in one block collide
+        builder.tx.nonce = random.randint(0, 2**32 - 1)
+        builder.add_signer(*self.signing_pair)
+        builder.tx.valid_until_block = self.block_height + self.valid_for_blocks
+
+        await builder.calculate_system_fee()
+
+        # Sign once so the witness exists for fee calculation, then re-sign over the real fee.
+        # Only the signing is timed: the fee RPCs are in RPC_LATENCY already
+        builder.tx.network_fee = 999
+        start = time.perf_counter()
+        await builder.build_and_sign()
+        sign_seconds = time.perf_counter() - start
+        await builder.calculate_network_fee()
+        builder.tx.witnesses = []
+
+        start = time.perf_counter()
+        tx = await builder.build_and_sign()
+        TX_SIGN_LATENCY.observe(sign_seconds + time.perf_counter() - start)
+
+        with TX_BROADCAST_LATENCY.time():
+            return await self.rpc.send_transaction(tx)
+
+    async def close(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        if self.rpc is not None:
+            await self.rpc.close()
+            self.rpc = None
@@ -0,0 +1,149 @@
+"""
+Batched confirmation tracker for broadcast hedges.
+
+`invoke` only tells us the node accepted a transaction. The tracker watches every
+outstanding tx_hash and, once per new block, checks ALL of them in a single JSON-RPC
+batch request (`getapplicationlog` + `gettransactionheight` per transaction).
+Confirmation therefore costs the same number of RPC calls for 1 or 500 pending hedges.
+Each hedge gets its real inclusion block, VM state and GAS consumed.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from agents.logs import get_logger
+from agents.metrics import ERRORS, RPC_LATENCY
+
+log = get_logger("confirmations")
+
+
+@dataclass
+class Confirmation:
+    tx_hash: str
+    submitted_height: int
+    status: str = "PENDING"  # PENDING -> CONFIRMED / FAULT / EXPIRED
+    block_height: Optional[int] = None  # real inclusion block
+    vm_state: Optional[str] = None
+    gas_consumed: Optional[float] = None  # GAS (system fee actually burned)
+    exception: Optional[str] = None
+    confirmed_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class ConfirmationTracker:
+    def __init__(self, session, poll_interval: float = 1.0, expire_after_blocks: int = 1500,
+                 history: int = 10000, on_update=None):
+        """
+        Args:
+            session: the ChainSession (pooled RPC connection and live block height).
+            poll_interval: seconds between checks for a new block.
+            expire_after_blocks: give up on a transaction once it can no longer be valid.
+            history: finished confirmations kept in memory for lookups.
+            on_update: optional `callback(Confirmation)` run when a transaction is settled.
+        """
+        self.session = session
+        self.poll_interval = poll_interval
+        self.expire_after_blocks = expire_after_blocks
+        self.history = history
+        self.on_update = on_update
+        self._records = {}  # tx_hash -> Confirmation
+        self._pending = set()
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def track(self, tx_hash: str, submitted_height: int) -> Confirmation:
+        """Watch `tx_hash` until it lands in a block. Tracking the same hash twice is a no-op."""
+        tx_hash = tx_hash.lower().removeprefix("0x")
+        record = self._records.get(tx_hash)
+        if record is None:
+            record = self._records[tx_hash] = Confirmation(tx_hash, submitted_height)
+            self._pending.add(tx_hash)
+            self.start()
+        return record
+
+    def get(self, tx_hash: str) -> Optional[Confirmation]:
+        return self._records.get(tx_hash.lower().removeprefix("0x"))
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def _run(self):
+        last_checked = -1
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            height = self.session.block_height
+            # One batch per new block: nothing can have landed in between
+            if not self._pending or not self.session.started or height == last_checked:
+                continue
+            last_checked = height
+            try:
+                await self.check(sorted(self._pending))
+            except Exception as e:
+                ERRORS.inc(component="confirmations")
+                log.warning(f"⚠️  Confirmation check failed: {e}", extra={"pending": len(self._pending)})
+
+    async def check(self, tx_hashes: list):
+        """Query every hash in ONE JSON-RPC batch request and settle those that landed."""
+        calls = []
+        for i, tx_hash in enumerate(tx_hashes):
+            calls.append({"jsonrpc": "2.0", "id": 2 * i, "method": "getapplicationlog", "params": [f"0x{tx_hash}"]})
+            calls.append({"jsonrpc": "2.0", "id": 2 * i + 1, "method": "gettransactionheight", "params": [f"0x{tx_hash}"]})
+
+        # Straight through the session's pooled aiohttp connection; NeoRpcClient has no batch call
+        with RPC_LATENCY.time(method="batch"):
+            async with self.session.rpc.session.post(self.session.rpc_url, json=calls) as response:
+                replies = await response.json(content_type=None)
+        if not isinstance(replies, list):
+            # The node rejected the whole batch (e.g. batching disabled)
+            raise ValueError(f"Unexpected batch response: {replies}")
+        by_id = {reply.get("id"): reply for reply in replies}
+
+        height = self.session.block_height
+        for i, tx_hash in enumerate(tx_hashes):
+            app_log = by_id.get(2 * i, {})
+            included = by_id.get(2 * i + 1, {})
+            record = self._records[tx_hash]
+
+            if "result" in app_log and "result" in included:
+                execution = app_log["result"]["executions"][0]
+                record.block_height = included["result"]
+                record.vm_state = execution["vmstate"]
+                record.gas_consumed = int(execution["gasconsumed"]) / 100_000_000
+                record.exception = execution.get("exception")
+                record.status = "CONFIRMED" if record.vm_state == "HALT" else "FAULT"
+            elif height - record.submitted_height > self.expire_after_blocks:
+                record.status = "EXPIRED"
+            else:
+                continue  # Unknown transaction: still in the mempool
+
+            record.confirmed_at = time.time()
+            self._pending.discard(tx_hash)
+            log.info(
+                f"⛓️  {tx_hash[:16]}... {record.status} in block #{record.block_height}",
+                extra={"tx_hash": tx_hash, "status": record.status, "block_height": record.block_height},
+            )
+            if self.on_update is not None:
+                self.on_update(record)
+
+        self._trim()
+
+    def _trim(self):
+        # Dicts keep insertion order: drop the oldest settled records beyond `history`
+        excess = len(self._records) - len(self._pending) - self.history
+        if excess <= 0:
+            return
+        for tx_hash in [h for h in self._records if h not in self._pending][:excess]:
+            del self._records[tx_hash]
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,49 @@
+"""
+SpoonOS SDK layer of the Executor agent: HedgeTool, the DummyLLM and the ExecutionAgent.
+
+Loaded on first use through `agents.agentb.<name>`; the HTTP server calls `execute_hedge`
+directly and never imports spoon_ai.
+"""
+from pydantic import Field
+from spoon_ai.tools.base import BaseTool
+from spoon_ai.agents import ToolCallAgent
+from spoon_ai.tools import ToolManager
+from spoon_ai.llm.base import LLMBase
+from spoon_ai.schema import LLMResponse
+
+from agents.agentb import execute_hedge
+
+
+# --- 1. DEFINE THE HEDGE TOOL ---
+class HedgeTool(BaseTool):
+    name: str = "execute_hedge"
+    description: str = "Hedges the specified USD amount by performing a REAL transaction on Neo N3."
+    parameters: dict = {
+        "type": "object",
+        "properties": {
+            "amount_usd": {
+                "type": "number",
+                "description": "The dollar value to hedge (e.g. 5000.0)"
+            }
+        },
+        "required": ["amount_usd"]
+    }
+
+    async def execute(self, amount_usd: float) -> dict:
+        """Execute the hedge transaction"""
+        return await execute_hedge(amount_usd)
+
+# --- DUMMY LLM (Required for SpoonOS ToolCallAgent) ---
+class DummyLLM(LLMBase):
+    async def chat(self, messages, **kwargs): return LLMResponse(content="Dummy")
+    async def completion(self, prompt, **kwargs): return LLMResponse(content="Dummy")
+    async def chat_with_tools(self, messages, **kwargs): return LLMResponse(content="Dummy")
+
+# --- 2. DEFINE THE AGENT ---
+class ExecutionAgent(ToolCallAgent):
+    name: str = "Alice's Executioner (Agent B)"
+    description: str = "An autonomous agent that secures funds on the Neo Blockchain."
+    llm: LLMBase = Field(default_factory=lambda: DummyLLM())
+    available_tools: ToolManager = Field(
+        default_factory=lambda: ToolManager([HedgeTool()])
+    )
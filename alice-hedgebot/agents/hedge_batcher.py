@@ -0,0 +1,121 @@
+"""
+Micro-batched hedge execution for the Executor agent.
+
+Hedges arriving within a short window (or until the batch is full) are combined into
+ONE Neo N3 transaction: one GAS self-transfer per hedge, concatenated into a single
+invocation script. It is signed and broadcast once; every caller gets the shared
+tx_hash plus its own units. Peak throughput scales with the batch size instead of
+with RPC round trips, and the network fee is paid once per batch.
+"""
+import asyncio
+
+from agents.logs import get_logger
+
+log = get_logger("hedge_batcher")
+
+
+class HedgeBatcher:
+    def __init__(self, session, window: float = 0.2, max_size: int = 50):
+        """
+        Args:
+            session: a started-or-startable ChainSession.
+            window: seconds to wait for more hedges after the first one arrives.
+            max_size: hedges per transaction; a full batch is sent immediately.
+        """
+        self.session = session
+        self.window = window
+        self.max_size = max_size
+        self._queue = None
+        self._collector = None
+        self._flushes = set()
+
+    async def submit(self, units: int) -> dict:
+        """Queue one hedge of `units` GAS units and wait for its batch to be broadcast."""
+        if self._collector is None:
+            self._queue = asyncio.Queue()
+            self._collector = asyncio.create_task(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((units, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.window
+                while len(batch) < self.max_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                # Broadcast in the background so the next batch starts collecting right away
+                flush = asyncio.create_task(self._flush(batch))
+                self._flushes.add(flush)
+                flush.add_done_callback(self._flushes.discard)
+                batch = []
+        except asyncio.CancelledError:
+            # Shutting down: fail everything not yet handed to a flush
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Hedge batcher stopped"))
+            raise
+
+    def build_script(self, amounts: list) -> bytes:
+        """One GAS self-transfer per hedge; ASSERT makes the batch all-or-nothing."""
+        from neo3 import vm  # already loaded by the session's start()
+
+        account = self.session.account
+        script = bytearray()
+        for units in amounts:
+            script.extend(self.session.gas_token.transfer(
+                source=account.script_hash,
+                destination=account.script_hash,
+                amount=units,
+                data=None
+            ).script)
+            script.append(vm.OpCode.ASSERT)
+        return bytes(script)
+
+    async def _flush(self, batch: list):
+        amounts = [units for units, _ in batch]
+        try:
+            await self.session.start()
+            from neo3.api.wrappers import ContractMethodResult  # loaded by start()
+
+            script = self.build_script(amounts)
+            log.info(
+                f"📦 Broadcasting batch of {len(batch)} hedges ({sum(amounts)} units)...",
+                extra={"batch_size": len(batch), "batch_units": sum(amounts)},
+            )
+            tx_hash = await self.session.invoke(ContractMethodResult(script))
+            shared = {
+                "tx_hash": str(tx_hash),
+                "block_height": self.session.block_height,
+                "wallet": self.session.account.address,
+                "batch_size": len(batch),
+                "batch_units": sum(amounts),
+            }
+            for units, future in batch:
+                if not future.done():
+                    future.set_result({**shared, "units_moved": units})
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def close(self):
+        if self._collector is not None:
+            self._collector.cancel()
+            await asyncio.gather(self._collector, return_exceptions=True)
+            self._collector = None
+        # Let batches already being broadcast finish so no caller is left hanging
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
@@ -0,0 +1,313 @@
+"""
+Asynchronous hedge job queue for the Executor agent.
+
+`/hedge` only enqueues a job and answers 202 right away; a bounded pool of workers
+runs the hedges in the background. Clients poll the job status (or get a callback).
+- Idempotency keys: a retried request with the same key returns the existing job,
+  so a client timeout can never cause a second transfer.
+- Backpressure: when the queue is full, new jobs are refused instead of piling up.
+- Persistence (optional `store`, the HedgeLedger): every status change is recorded, so
+  idempotency keys survive a restart and jobs still queued at shutdown run after it.
+  Shutdown lets running hedges finish; a job that was cut off mid-hedge is settled from
+  the ledger on restart, never run a second time.
+- Callbacks only go to hosts on an allowlist, so callers cannot aim the executor at
+  internal services.
+"""
+import asyncio
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field, fields, asdict
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from agents.logs import get_logger
+from agents.metrics import ERRORS, HEDGE_JOB_LATENCY
+
+log = get_logger("hedge_jobs")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def check_callback_url(url: str, allowed_hosts: frozenset):
+    """
+    Raise ValueError unless `url` is http(s) to a host in `allowed_hosts`
+    (exact hostname match; an empty allowlist disables callbacks).
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http(s) URL")
+    if parts.hostname.lower() not in allowed_hosts:
+        raise ValueError(f"callback_url host '{parts.hostname}' is not allowed (see HEDGE_CALLBACK_HOSTS)")
+
+
+@dataclass
+class HedgeJob:
+    job_id: str
+    amount_usd: float
+    idempotency_key: Optional[str] = None
+    callback_url: Optional[str] = None
+    status: str = "QUEUED"  # QUEUED -> RUNNING -> SUCCEEDED / FAILED
+    result: Optional[dict] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("SUCCEEDED", "FAILED")
+
+    @classmethod
+    def from_record(cls, record: dict) -> "HedgeJob":
+        return cls(**{f.name: record[f.name] for f in fields(cls) if f.name in record})
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("callback_url")
+        return data
+
+
+class HedgeJobQueue:
+    def __init__(self, run_hedge, workers: int = 4, max_pending: int = 100, job_ttl: float = 3600.0,
+                 store=None, drain_timeout: float = 30.0, callback_hosts: frozenset = frozenset()):
+        """
+        Args:
+            run_hedge: `async (amount_usd, idempotency_key) -> dict`, e.g. agentb.execute_hedge.
+            workers: hedges executed concurrently.
+            max_pending: queued jobs allowed before new ones are refused.
+            job_ttl: seconds a finished job is kept in memory (the store still has it).
+            store: optional persistence with `record_job(job)`, `flush()`, `find_job(job_id, idempotency_key)`,
+                `open_jobs()` and `find_hedge(idempotency_key)`, e.g. the HedgeLedger.
+            drain_timeout: seconds `close()` waits for running hedges before cancelling them.
+            callback_hosts: hostnames `callback_url` may point to.
+        """
+        self.run_hedge = run_hedge
+        self.workers = workers
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.store = store
+        self.drain_timeout = drain_timeout
+        self.callback_hosts = frozenset(h.lower() for h in callback_hosts)
+        self._jobs = {}  # job_id -> HedgeJob
+        self._keys = {}  # idempotency key -> job_id
+        self._finished = deque()  # job_ids in completion order, for cheap expiry
+        self._queue = None
+        self._workers = []
+        self._busy = set()  # workers in the middle of a hedge
+        self._closing = False
+        self._http = None
+
+    def start(self):
+        if self._workers:
+            return
+        self._closing = False
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def restore(self) -> int:
+        """
+        Resume the jobs the store still has open (call before `start()`). QUEUED jobs are
+        queued again. A RUNNING job was cut off mid-hedge: it takes the result the ledger
+        recorded for its key, or fails as interrupted. It is never run twice.
+        Returns the number of jobs queued again.
+        """
+        if self.store is None:
+            return 0
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+
+        requeued = 0
+        for record in await self.store.open_jobs():
+            job = HedgeJob.from_record(record)
+            self._remember(job)
+            if job.status == "QUEUED":
+                try:
+                    self._queue.put_nowait(job)
+                    requeued += 1
+                    continue
+                except asyncio.QueueFull:
+                    job.result = {"status": "ERROR", "error": "Hedge queue was full on restart"}
+            else:
+                hedge = await self.store.find_hedge(job.idempotency_key) if job.idempotency_key else None
+                job.result = _result_from_hedge(hedge) if hedge else {
+                    "status": "ERROR",
+                    "error": "Interrupted by an executor restart; it may have been broadcast, check /hedges before hedging again",
+                }
+            self._finish(job, "SUCCEEDED" if job.result.get("status") == "SUCCESS" else "FAILED")
+        return requeued
+
+    async def submit(self, amount_usd: float, idempotency_key: Optional[str] = None,
+                     callback_url: Optional[str] = None) -> tuple:
+        """
+        Enqueue a hedge. Returns `(job, created)`; `created` is False for a deduplicated retry.
+
+        Raises:
+            QueueFullError: if `max_pending` jobs are already waiting, or the queue is shutting down.
+            ValueError: if `callback_url` is not allowed.
+        """
+        if callback_url:
+            check_callback_url(callback_url, self.callback_hosts)
+        if self._closing:
+            raise QueueFullError("Hedge queue is shutting down")
+        self.start()
+        self._evict_expired()
+
+        if idempotency_key:
+            existing = await self.find_by_key(idempotency_key)
+            if existing is not None:
+                return existing, False
+
+        job = HedgeJob(uuid.uuid4().hex, amount_usd, idempotency_key, callback_url)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Hedge queue is full ({self.max_pending} pending jobs)")
+
+        self._remember(job)
+        self._record(job)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[HedgeJob]:
+        return self._jobs.get(job_id)
+
+    async def find(self, job_id: str) -> Optional[HedgeJob]:
+        """`get`, falling back to the store for jobs evicted from memory or from before a restart."""
+        job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            record = await self.store.find_job(job_id=job_id)
+            job = HedgeJob.from_record(record) if record else None
+        return job
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def find_by_key(self, idempotency_key: str) -> Optional[HedgeJob]:
+        """The job submitted with `idempotency_key`, from memory or the store."""
+        if idempotency_key in self._keys:
+            return self._jobs[self._keys[idempotency_key]]
+        if self.store is None:
+            return None
+        record = await self.store.find_job(idempotency_key=idempotency_key)
+        # A concurrent retry may have created the job while the store was read
+        if idempotency_key in self._keys:
+            return self._jobs[self._keys[idempotency_key]]
+        if record is None:
+            return None
+        job = HedgeJob.from_record(record)
+        self._remember(job)
+        if job.done:
+            self._finished.append(job.job_id)
+        return job
+
+    def _remember(self, job: HedgeJob):
+        self._jobs[job.job_id] = job
+        if job.idempotency_key:
+            self._keys[job.idempotency_key] = job.job_id
+
+    def _record(self, job: HedgeJob):
+        if self.store is not None:
+            self.store.record_job(job)
+
+    def _finish(self, job: HedgeJob, status: str):
+        job.status = status
+        job.finished_at = time.time()
+        self._finished.append(job.job_id)
+        self._record(job)
+
+    async def _work(self):
+        worker = asyncio.current_task()
+        while not self._closing:
+            job = await self._queue.get()
+            self._busy.add(worker)
+            try:
+                await self._run(job)
+            finally:
+                self._busy.discard(worker)
+                self._queue.task_done()
+
+    async def _run(self, job: HedgeJob):
+        job.status = "RUNNING"
+        self._record(job)
+        if self.store is not None:
+            # On disk before the transfer starts: after a crash from here on, it is never re-run
+            await self.store.flush()
+        try:
+            job.result = await self.run_hedge(job.amount_usd, job.idempotency_key)
+            status = "SUCCEEDED" if job.result.get("status") == "SUCCESS" else "FAILED"
+        except Exception as e:
+            job.result = {"status": "ERROR", "error": str(e)}
+            status = "FAILED"
+        self._finish(job, status)
+        HEDGE_JOB_LATENCY.observe(job.finished_at - job.created_at, status=job.status)
+
+        if job.callback_url:
+            await self._notify(job)
+
+    async def _notify(self, job: HedgeJob):
+        """Best-effort POST of the finished job to the client's callback URL."""
+        if self._http is None:
+            # No redirects: a 3xx could otherwise point the request past the host allowlist
+            self._http = httpx.AsyncClient(timeout=5.0, follow_redirects=False)
+        try:
+            await self._http.post(job.callback_url, json=job.to_dict())
+        except Exception as e:
+            ERRORS.inc(component="callback")
+            log.warning(f"⚠️ Callback to {job.callback_url} failed: {e}", extra={"job_id": job.job_id})
+
+    def _evict_expired(self):
+        cutoff = time.time() - self.job_ttl
+        while self._finished and self._jobs[self._finished[0]].finished_at < cutoff:
+            job = self._jobs.pop(self._finished.popleft())
+            if job.idempotency_key:
+                self._keys.pop(job.idempotency_key, None)
+
+    async def close(self):
+        """
+        Stop taking jobs and let running hedges finish (up to `drain_timeout`).
+        Jobs still queued stay QUEUED in the store and run after the next `restore()`.
+        """
+        self._closing = True
+        busy = [w for w in self._workers if w in self._busy]
+        for worker in self._workers:
+            if worker not in self._busy:
+                worker.cancel()
+        if busy:
+            log.info(f"⏳ Waiting for {len(busy)} running hedges to finish...")
+            _, unfinished = await asyncio.wait(busy, timeout=self.drain_timeout)
+            for worker in unfinished:
+                worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        left = self.pending
+        if left:
+            if self.store is not None:
+                log.info(f"📒 {left} queued hedges kept for the next start", extra={"pending": left})
+            else:
+                log.warning(f"⚠️ {left} queued hedges dropped at shutdown (no store)", extra={"pending": left})
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+def _result_from_hedge(hedge: dict) -> dict:
+    """The HedgeTool-style result of a ledger row."""
+    if hedge["status"] != "SUCCESS":
+        return {"status": "ERROR", "error": hedge["error"], "gas_locked": 0, "block_height": 0}
+    result = {
+        "status": "SUCCESS",
+        "tx_hash": hedge["tx_hash"],
+        "gas_locked": hedge["gas_locked"],
+        "units_moved": hedge["units"],
+        "block_height": hedge["block_height"],
+        "wallet": hedge["wallet"],
+        "confirmation": hedge["confirmation"],
+    }
+    if hedge["batch_size"]:
+        result["batch_size"] = hedge["batch_size"]
+    return result
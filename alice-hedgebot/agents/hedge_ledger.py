@@ -0,0 +1,391 @@
+"""
+Append-only hedge ledger for the Executor agent (SQLite, WAL mode).
+
+Every HedgeTool result becomes one row in `hedges`; every settled transaction becomes
+one row in `confirmations` (batched hedges share a tx_hash, so they share that row);
+every status change of a queued hedge job becomes one row in `jobs`.
+Rows are never updated or deleted (triggers enforce it): the current state of a hedge
+is its row joined with its confirmation, if any, and a job's is its latest row.
+
+- Writes are buffered and flushed in one transaction per burst, on a worker thread,
+  so recording a hedge never blocks the event loop.
+- Reads use their own connection; WAL lets them run while a flush is in progress.
+- Indexed by time, wallet and tx_hash; listing uses keyset pagination (`cursor` = last id),
+  so page 1 and page 1000 cost the same.
+- On restart, `unconfirmed()` tells the ConfirmationTracker what to resume watching,
+  `open_jobs()` tells the HedgeJobQueue what to resume, and `find_job()` / `find_hedge()`
+  keep idempotency keys valid across restarts.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from agents.logs import get_logger
+from agents.metrics import ERRORS
+
+log = get_logger("hedge_ledger")
+
+MAX_PAGE_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hedges (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at    REAL    NOT NULL,
+    amount_usd    REAL    NOT NULL,
+    units         INTEGER NOT NULL,
+    gas_locked    REAL    NOT NULL,
+    status        TEXT    NOT NULL,  -- HedgeTool status: SUCCESS / ERROR
+    tx_hash       TEXT,
+    wallet        TEXT,
+    block_height  INTEGER,           -- height at broadcast
+    batch_size    INTEGER,
+    error         TEXT,
+    idempotency_key TEXT             -- the client's key, for dedup across restarts
+);
+CREATE INDEX IF NOT EXISTS hedges_created_at ON hedges (created_at);
+CREATE INDEX IF NOT EXISTS hedges_wallet ON hedges (wallet, id);
+CREATE INDEX IF NOT EXISTS hedges_tx_hash ON hedges (tx_hash);
+CREATE INDEX IF NOT EXISTS hedges_idempotency_key ON hedges (idempotency_key);
+
+CREATE TABLE IF NOT EXISTS confirmations (
+    tx_hash       TEXT PRIMARY KEY,
+    status        TEXT NOT NULL,     -- CONFIRMED / FAULT / EXPIRED
+    block_height  INTEGER,           -- real inclusion block
+    vm_state      TEXT,
+    gas_consumed  REAL,
+    exception     TEXT,
+    confirmed_at  REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id          TEXT NOT NULL,
+    idempotency_key TEXT,
+    callback_url    TEXT,
+    amount_usd      REAL NOT NULL,
+    status          TEXT NOT NULL,   -- QUEUED / RUNNING / SUCCEEDED / FAILED
+    result          TEXT,            -- HedgeTool result (JSON) once finished
+    created_at      REAL NOT NULL,
+    finished_at     REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_job_id ON jobs (job_id, id);
+CREATE INDEX IF NOT EXISTS jobs_idempotency_key ON jobs (idempotency_key);
+
+CREATE TRIGGER IF NOT EXISTS hedges_no_update BEFORE UPDATE ON hedges
+BEGIN SELECT RAISE(ABORT, 'hedge ledger is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS hedges_no_delete BEFORE DELETE ON hedges
+BEGIN SELECT RAISE(ABORT, 'hedge ledger is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS confirmations_no_update BEFORE UPDATE ON confirmations
+BEGIN SELECT RAISE(ABORT, 'hedge ledger is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS confirmations_no_delete BEFORE DELETE ON confirmations
+BEGIN SELECT RAISE(ABORT, 'hedge ledger is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS jobs_no_update BEFORE UPDATE ON jobs
+BEGIN SELECT RAISE(ABORT, 'hedge ledger is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS jobs_no_delete BEFORE DELETE ON jobs
+BEGIN SELECT RAISE(ABORT, 'hedge ledger is append-only'); END;
+"""
+
+JOB_COLUMNS = "job_id, idempotency_key, callback_url, amount_usd, status, result, created_at, finished_at"
+
+# A hedge's row plus its settlement; broadcast hedges without one are still PENDING
+SELECT_HEDGES = """
+SELECT h.id, h.created_at, h.amount_usd, h.units, h.gas_locked, h.status, h.tx_hash, h.wallet,
+       h.block_height, h.batch_size, h.error, h.idempotency_key,
+       CASE WHEN h.tx_hash IS NULL THEN NULL ELSE COALESCE(c.status, 'PENDING') END AS confirmation,
+       c.block_height AS confirmed_block, c.vm_state, c.gas_consumed, c.confirmed_at
+FROM hedges h LEFT JOIN confirmations c ON c.tx_hash = h.tx_hash
+"""
+
+
+def _normalize(tx_hash: Optional[str]) -> Optional[str]:
+    # Same form as ConfirmationTracker: lowercase hex, no 0x
+    return tx_hash.lower().removeprefix("0x") if tx_hash else None
+
+
+def _job_record(row: dict) -> dict:
+    record = {key: row[key] for key in row if key != "id"}
+    record["result"] = json.loads(record["result"]) if record["result"] else None
+    return record
+
+
+def _filters(wallet=None, status=None, tx_hash=None, since=None, until=None) -> tuple:
+    clauses, params = [], []
+    if wallet:
+        clauses.append("h.wallet = ?")
+        params.append(wallet)
+    if status:
+        clauses.append("h.status = ?")
+        params.append(status.upper())
+    if tx_hash:
+        clauses.append("h.tx_hash = ?")
+        params.append(_normalize(tx_hash))
+    if since is not None:
+        clauses.append("h.created_at >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("h.created_at < ?")
+        params.append(until)
+    return clauses, params
+
+
+class HedgeLedger:
+    def __init__(self, path: str = "hedges.db", flush_interval: float = 0.05):
+        """
+        Args:
+            path: SQLite database file (created on first start).
+            flush_interval: seconds buffered rows may wait, so bursts share one commit.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self._writer = None  # sqlite3.Connection used only by flushes
+        self._reader = None
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._buffer = []  # (table, row) waiting for the next flush
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: durable across process crashes, fsync only at checkpoints
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    async def start(self):
+        """Open the database (creating the schema) and start the background writer."""
+        if self._task is not None:
+            return
+        if self._writer is None:
+            def open_db():
+                writer = self._connect()
+                writer.executescript(SCHEMA)
+                return writer, self._connect()
+            self._writer, self._reader = await asyncio.to_thread(open_db)
+        self._task = asyncio.create_task(self._run())
+
+    # --- WRITES ---
+    def append(self, amount_usd: float, result: dict, idempotency_key: Optional[str] = None):
+        """Record one HedgeTool result. Returns immediately; the row is written on the next flush."""
+        self._push("hedges", (
+            time.time(),
+            float(amount_usd),
+            int(result.get("units_moved") or 0),
+            float(result.get("gas_locked") or 0),
+            result.get("status", "ERROR"),
+            _normalize(result.get("tx_hash")),
+            result.get("wallet"),
+            result.get("block_height") or None,
+            result.get("batch_size"),
+            result.get("error"),
+            idempotency_key,
+        ))
+
+    def record_confirmation(self, record):
+        """ConfirmationTracker `on_update` callback: store how a transaction settled."""
+        self._push("confirmations", (
+            _normalize(record.tx_hash),
+            record.status,
+            record.block_height,
+            record.vm_state,
+            record.gas_consumed,
+            record.exception,
+            record.confirmed_at or time.time(),
+        ))
+
+    def record_job(self, job):
+        """HedgeJobQueue store hook: append the job's current state."""
+        self._push("jobs", (
+            job.job_id,
+            job.idempotency_key,
+            job.callback_url,
+            float(job.amount_usd),
+            job.status,
+            json.dumps(job.result) if job.result is not None else None,
+            job.created_at,
+            job.finished_at,
+        ))
+
+    def _push(self, table: str, row: tuple):
+        self._buffer.append((table, row))
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything buffered so far in one transaction."""
+        if not self._buffer or self._writer is None:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            # Keep the rows for the next flush rather than losing hedges
+            self._buffer[:0] = batch
+            ERRORS.inc(component="ledger")
+            log.error(f"⚠️  Hedge ledger write failed: {e}", extra={"rows": len(batch)})
+
+    def _write(self, batch: list):
+        hedges = [row for table, row in batch if table == "hedges"]
+        settled = [row for table, row in batch if table == "confirmations"]
+        jobs = [row for table, row in batch if table == "jobs"]
+        with self._write_lock:
+            self._writer.execute("BEGIN")
+            try:
+                if hedges:
+                    self._writer.executemany(
+                        "INSERT INTO hedges (created_at, amount_usd, units, gas_locked, status, tx_hash, "
+                        "wallet, block_height, batch_size, error, idempotency_key) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        hedges,
+                    )
+                if settled:
+                    # A transaction settles once; a repeat (e.g. after a restart) is ignored
+                    self._writer.executemany(
+                        "INSERT OR IGNORE INTO confirmations VALUES (?, ?, ?, ?, ?, ?, ?)", settled
+                    )
+                if jobs:
+                    self._writer.executemany(
+                        f"INSERT INTO jobs ({JOB_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", jobs
+                    )
+                self._writer.execute("COMMIT")
+            except Exception:
+                self._writer.execute("ROLLBACK")
+                raise
+
+    # --- READS ---
+    async def _read(self, sql: str, params: list) -> list:
+        def run():
+            with self._read_lock:
+                return [dict(row) for row in self._reader.execute(sql, params)]
+        return await asyncio.to_thread(run)
+
+    async def query(self, wallet: str = None, status: str = None, tx_hash: str = None,
+                    since: float = None, until: float = None, cursor: int = None, limit: int = 100) -> dict:
+        """
+        Newest-first page of hedges. Pass the returned `next_cursor` back as `cursor`
+        for the next page; it is None on the last one.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        clauses, params = _filters(wallet, status, tx_hash, since, until)
+        if cursor is not None:
+            clauses.append("h.id < ?")
+            params.append(int(cursor))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = await self._read(f"{SELECT_HEDGES} {where} ORDER BY h.id DESC LIMIT ?", params + [limit + 1])
+        next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+        return {"hedges": rows[:limit], "next_cursor": next_cursor}
+
+    async def summary(self, wallet: str = None, since: float = None, until: float = None) -> dict:
+        """Totals over the matching hedges; GAS consumed is counted once per transaction."""
+        clauses, params = _filters(wallet, None, None, since, until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = await self._read(f"""
+            SELECT COUNT(*) AS hedges,
+                   COALESCE(SUM(h.status = 'SUCCESS'), 0) AS succeeded,
+                   COALESCE(SUM(h.status != 'SUCCESS'), 0) AS failed,
+                   COALESCE(SUM(h.amount_usd), 0) AS amount_usd,
+                   COALESCE(SUM(h.units), 0) AS units,
+                   COALESCE(SUM(h.gas_locked), 0) AS gas_locked,
+                   COUNT(DISTINCT h.tx_hash) AS transactions,
+                   COALESCE(SUM(h.tx_hash IS NOT NULL AND c.status IS NULL), 0) AS pending,
+                   COALESCE(SUM(c.status = 'CONFIRMED'), 0) AS confirmed,
+                   COALESCE(SUM(c.status = 'FAULT'), 0) AS fault,
+                   COALESCE(SUM(c.status = 'EXPIRED'), 0) AS expired,
+                   MIN(h.created_at) AS first_at,
+                   MAX(h.created_at) AS last_at
+            FROM hedges h LEFT JOIN confirmations c ON c.tx_hash = h.tx_hash
+            {where}
+        """, params)
+        fees = await self._read(f"""
+            SELECT COALESCE(SUM(gas_consumed), 0) AS gas_consumed FROM confirmations
+            WHERE tx_hash IN (SELECT h.tx_hash FROM hedges h {where})
+        """, params)
+        return {**rows[0], **fees[0]}
+
+    async def timeseries(self, bucket_seconds: int = 3600, wallet: str = None,
+                         since: float = None, until: float = None) -> list:
+        """Hedge count, volume and GAS locked per time bucket (bucket = start time, epoch seconds)."""
+        bucket_seconds = max(1, int(bucket_seconds))
+        clauses, params = _filters(wallet, None, None, since, until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return await self._read(f"""
+            SELECT CAST(h.created_at / ? AS INTEGER) * ? AS bucket,
+                   COUNT(*) AS hedges,
+                   SUM(h.status = 'SUCCESS') AS succeeded,
+                   SUM(h.amount_usd) AS amount_usd,
+                   SUM(h.units) AS units,
+                   SUM(h.gas_locked) AS gas_locked
+            FROM hedges h {where}
+            GROUP BY bucket ORDER BY bucket
+        """, [bucket_seconds, bucket_seconds] + params)
+
+    async def get_confirmation(self, tx_hash: str) -> Optional[dict]:
+        rows = await self._read("SELECT * FROM confirmations WHERE tx_hash = ?", [_normalize(tx_hash)])
+        return rows[0] if rows else None
+
+    async def find_hedge(self, idempotency_key: str) -> Optional[dict]:
+        """The hedge recorded for `idempotency_key` (first one, with its settlement), if any."""
+        rows = await self._read(
+            f"{SELECT_HEDGES} WHERE h.idempotency_key = ? ORDER BY h.id LIMIT 1", [idempotency_key]
+        )
+        return rows[0] if rows else None
+
+    async def find_job(self, job_id: str = None, idempotency_key: str = None) -> Optional[dict]:
+        """Latest state of a job, by id or by the idempotency key it was submitted with."""
+        if job_id is None:
+            rows = await self._read(
+                "SELECT job_id FROM jobs WHERE idempotency_key = ? ORDER BY id LIMIT 1", [idempotency_key]
+            )
+            if not rows:
+                return None
+            job_id = rows[0]["job_id"]
+        rows = await self._read(
+            "SELECT * FROM jobs WHERE job_id = ? ORDER BY id DESC LIMIT 1", [job_id]
+        )
+        return _job_record(rows[0]) if rows else None
+
+    async def open_jobs(self) -> list:
+        """Jobs whose latest state is QUEUED or RUNNING, oldest first."""
+        rows = await self._read("""
+            SELECT j.* FROM jobs j JOIN (SELECT MAX(id) AS id FROM jobs GROUP BY job_id) last ON last.id = j.id
+            WHERE j.status IN ('QUEUED', 'RUNNING')
+            ORDER BY j.id
+        """, [])
+        return [_job_record(row) for row in rows]
+
+    async def unconfirmed(self) -> list:
+        """`(tx_hash, broadcast height)` of every broadcast transaction that has not settled yet."""
+        rows = await self._read("""
+            SELECT h.tx_hash, MIN(h.block_height) AS block_height
+            FROM hedges h LEFT JOIN confirmations c ON c.tx_hash = h.tx_hash
+            WHERE h.tx_hash IS NOT NULL AND c.tx_hash IS NULL
+            GROUP BY h.tx_hash
+        """, [])
+        return [(row["tx_hash"], row["block_height"] or 0) for row in rows]
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+        def close_db():
+            # The locks wait out a flush or read still running on a worker thread
+            with self._write_lock, self._read_lock:
+                for conn in (self._writer, self._reader):
+                    if conn is not None:
+                        conn.close()
+        await asyncio.to_thread(close_db)
+        self._writer = self._reader = None
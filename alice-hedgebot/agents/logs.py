@@ -0,0 +1,85 @@
+"""
+Structured, non-blocking logging for both agents.
+
+Loggers only put records on an in-memory queue (QueueHandler); a QueueListener thread
+formats them and writes to stdout. A slow terminal or `docker logs` pipe therefore never
+stalls the event loop. Records are JSON lines by default; fields passed through
+`extra={...}` become top-level keys.
+
+    HEDGEBOT_LOG_FORMAT=json|text   (default json)
+    HEDGEBOT_LOG_LEVEL=INFO
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+
+LOG_FORMAT = os.getenv("HEDGEBOT_LOG_FORMAT", "json").lower()
+LOG_LEVEL = os.getenv("HEDGEBOT_LOG_LEVEL", "INFO").upper()
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep the message and the traceback apart (the stock handler merges them into msg)
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging():
+    """Route the `hedgebot` logger tree through the queue. Safe to call repeatedly."""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "text":
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger("hedgebot")
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(_QueueHandler(log_queue))
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """A `hedgebot.<name>` logger, with the queue set up on first use."""
+    setup_logging()
+    return logging.getLogger(f"hedgebot.{name}")
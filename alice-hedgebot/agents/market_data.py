@@ -0,0 +1,221 @@
+"""
+Async CoinGecko market-data layer for the Oracle agent.
+
+- One pooled keep-alive HTTP connection (httpx.AsyncClient) shared by every request.
+- Identical in-flight requests for the same asset are merged into ONE upstream call.
+- Per-asset TTL cache with stale-while-revalidate: a stale entry is served instantly
+  while a single background refresh runs, so a slow upstream never shows up in p99.
+- Batch lookups fetch every missing asset with one paginated, comma-joined `ids` query.
+"""
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+
+from agents.logs import get_logger
+from agents.metrics import COINGECKO_LATENCY, ERRORS, MARKET_CACHE
+
+log = get_logger("market_data")
+
+COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+COINGECKO_MAX_PER_PAGE = 250
+
+
+class MarketDataClient:
+    def __init__(
+        self,
+        url: str = COINGECKO_MARKETS_URL,
+        ttl: float = 10.0,
+        stale_ttl: float = 60.0,
+        timeout: float = 5.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Args:
+            url: CoinGecko `coins/markets` endpoint.
+            ttl: seconds a cached quote is considered fresh.
+            stale_ttl: extra seconds a stale quote may still be served while it is revalidated.
+            timeout: total seconds an upstream request may take.
+            transport: optional httpx transport, e.g. `httpx.ASGITransport` over bench/stand_ins.py.
+        """
+        self.url = url
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.transport = transport
+        self._client = None
+        self._cache = {}  # asset -> (fetched_at, market row)
+        self._inflight = {}  # asset -> asyncio.Task
+
+    def _http(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                headers={"Accept": "application/json"},
+                transport=self.transport,
+            )
+        return self._client
+
+    async def get_market(self, asset: str) -> dict:
+        """Return the CoinGecko market row for `asset`, from cache whenever possible."""
+        asset = asset.lower()
+        entry = self._cache.get(asset)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                MARKET_CACHE.inc(result="hit")
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                # Stale-while-revalidate: answer now, refresh once in the background
+                MARKET_CACHE.inc(result="stale")
+                self._refresh(asset)
+                return entry[1]
+
+        MARKET_CACHE.inc(result="coalesced" if asset in self._inflight else "miss")
+        # shield() so a client disconnect never cancels the shared upstream call
+        return await asyncio.shield(self._refresh(asset))
+
+    async def get_markets(self, assets: list, max_age: Optional[float] = None) -> dict:
+        """
+        Return `{asset: market row}` for many assets at once.
+        Cached assets cost nothing; all the others share ONE upstream query.
+        Assets CoinGecko does not know are left out of the result.
+
+        Args:
+            assets: CoinGecko asset ids.
+            max_age: if set, entries older than this are refetched instead of served stale.
+        """
+        assets = list(dict.fromkeys(a.lower() for a in assets))
+        now = time.monotonic()
+        fresh_limit = self.ttl if max_age is None else min(self.ttl, max_age)
+        stale_limit = self.ttl + self.stale_ttl if max_age is None else fresh_limit
+        result = {}
+        pending = {}
+        missing = []
+        stale = []
+
+        for asset in assets:
+            entry = self._cache.get(asset)
+            age = now - entry[0] if entry is not None else None
+            if age is not None and age < fresh_limit:
+                MARKET_CACHE.inc(result="hit")
+                result[asset] = entry[1]
+            elif age is not None and age < stale_limit:
+                MARKET_CACHE.inc(result="stale")
+                result[asset] = entry[1]
+                if asset not in self._inflight:
+                    stale.append(asset)
+            elif asset in self._inflight:
+                MARKET_CACHE.inc(result="coalesced")
+                pending[asset] = self._inflight[asset]
+            else:
+                MARKET_CACHE.inc(result="miss")
+                missing.append(asset)
+
+        if stale:
+            self._refresh_many(stale)
+        if missing:
+            pending.update(self._refresh_many(missing))
+
+        if pending:
+            rows = await asyncio.gather(
+                *(asyncio.shield(t) for t in pending.values()), return_exceptions=True
+            )
+            for asset, row in zip(pending, rows):
+                if not isinstance(row, BaseException):
+                    result[asset] = row
+
+        return result
+
+    def _refresh_many(self, assets: list) -> dict:
+        """Start one batched upstream request and register it as in-flight for every asset."""
+        batch = asyncio.ensure_future(self._fetch_many(assets))
+        tasks = {}
+        for asset in assets:
+            task = asyncio.ensure_future(self._pick(batch, asset))
+            self._inflight[asset] = task
+            task.add_done_callback(lambda t, a=asset: self._finish(a, t))
+            tasks[asset] = task
+        return tasks
+
+    @staticmethod
+    async def _pick(batch: asyncio.Task, asset: str) -> dict:
+        rows = await batch
+        if asset not in rows:
+            raise ValueError(f"Asset '{asset}' not found.")
+        return rows[asset]
+
+    def _refresh(self, asset: str) -> asyncio.Task:
+        """Start (or join) the single in-flight upstream request for `asset`."""
+        task = self._inflight.get(asset)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(asset))
+            self._inflight[asset] = task
+            task.add_done_callback(lambda t, a=asset: self._finish(a, t))
+        return task
+
+    def _finish(self, asset: str, task: asyncio.Task):
+        self._inflight.pop(asset, None)
+        if not task.cancelled() and task.exception() is not None:
+            # Background refreshes have no awaiter; retrieve the error so it is not lost
+            log.warning("⚠️  Market fetch failed", extra={"asset": asset, "error": str(task.exception())})
+
+    async def _fetch(self, asset: str) -> dict:
+        params = {
+            "vs_currency": "usd",
+            "ids": asset,
+            "order": "market_cap_desc",
+            "per_page": 1,
+            "page": 1,
+            "sparkline": "false",
+        }
+        response = await self._get(params)
+        rows = response.json()
+        if not rows:
+            raise ValueError(f"Asset '{asset}' not found.")
+
+        self._cache[asset] = (time.monotonic(), rows[0])
+        return rows[0]
+
+    async def _fetch_many(self, assets: list) -> dict:
+        rows = {}
+        page = 1
+        while True:
+            params = {
+                "vs_currency": "usd",
+                "ids": ",".join(assets),
+                "order": "market_cap_desc",
+                "per_page": COINGECKO_MAX_PER_PAGE,
+                "page": page,
+                "sparkline": "false",
+            }
+            response = await self._get(params)
+            batch = response.json()
+
+            fetched_at = time.monotonic()
+            for row in batch:
+                rows[row["id"]] = row
+                self._cache[row["id"]] = (fetched_at, row)
+
+            if len(batch) < COINGECKO_MAX_PER_PAGE or len(rows) >= len(assets):
+                return rows
+            page += 1
+
+    async def _get(self, params: dict) -> httpx.Response:
+        try:
+            with COINGECKO_LATENCY.time():
+                response = await self._http().get(self.url, params=params)
+            response.raise_for_status()
+        except Exception:
+            ERRORS.inc(component="coingecko")
+            raise
+        return response
+
+    async def aclose(self):
+        """Close the pooled connection."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
@@ -0,0 +1,183 @@
+"""
+Prometheus metrics for both agents, in the text exposition format, with no extra dependency.
+
+Counters and histograms live in one process-wide registry, so the orchestrator (main.py)
+serves the Oracle's and the Executor's numbers from the same `/metrics`.
+Recording is a dict lookup plus a few additions: cheap enough for every request.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds: 1 ms .. 30 s, fits loopback calls as well as a slow public RPC node
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # label values tuple -> state
+        self._lock = threading.Lock()  # the sync Oracle path may record from other threads
+        REGISTRY.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, state in items:
+            lines.extend(self._samples(key, state))
+        return lines
+
+    def _samples(self, key: tuple, state) -> list:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self, key: tuple, value: float) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        # bisect_left: a value equal to a bound belongs to that bucket (le = "less or equal")
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (last slot = +Inf), sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def time(self, **labels) -> "_Timer":
+        """`with histogram.time(method="x"):` records the block's duration (errors included)."""
+        return _Timer(self, labels)
+
+    def _samples(self, key: tuple, state) -> list:
+        counts, total = state
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = f'le="{_format_number(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+def timed(histogram: Histogram, **labels):
+    """Decorator for async handlers: observe the duration of every call."""
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render() -> str:
+    """The whole registry in Prometheus text format (serve with CONTENT_TYPE)."""
+    return REGISTRY.render()
+
+
+# --- HEDGEBOT METRICS ---
+HTTP_LATENCY = Histogram(
+    "hedgebot_http_request_seconds", "End-to-end latency of agent HTTP endpoints.", ("endpoint",))
+COINGECKO_LATENCY = Histogram(
+    "hedgebot_coingecko_request_seconds", "Latency of upstream CoinGecko coins/markets requests.")
+MARKET_CACHE = Counter(
+    "hedgebot_market_cache_total",
+    "Market data lookups by cache result (hit, stale, coalesced, miss).", ("result",))
+RPC_LATENCY = Histogram(
+    "hedgebot_neo_rpc_seconds", "Latency of Neo N3 JSON-RPC calls by method.", ("method",))
+TX_SIGN_LATENCY = Histogram(
+    "hedgebot_tx_sign_seconds", "Time spent signing a hedge transaction (both signatures; fee RPCs are in the Neo RPC histogram).")
+TX_BROADCAST_LATENCY = Histogram(
+    "hedgebot_tx_broadcast_seconds", "Time for sendrawtransaction to accept a signed hedge.")
+HEDGE_JOB_LATENCY = Histogram(
+    "hedgebot_hedge_job_seconds", "Queued-to-finished time of hedge jobs.", ("status",))
+ERRORS = Counter(
+    "hedgebot_errors_total", "Errors by component.", ("component",))
+RISK_TRANSITIONS = Counter(
+    "hedgebot_risk_transitions_total", "Risk level changes per asset.", ("asset", "from_level", "to_level"))
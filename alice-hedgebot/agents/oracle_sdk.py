@@ -0,0 +1,73 @@
+"""
+SpoonOS SDK layer of the Oracle agent: the market risk tools and the OracleAgent.
+
+Loaded on first use through `agents.agent_oracle.<name>`; the HTTP server never needs
+spoon_ai, so it does not pay for importing it.
+"""
+from pydantic import Field
+from spoon_ai.tools.base import BaseTool
+from spoon_ai.agents import ToolCallAgent
+from spoon_ai.tools import ToolManager
+
+from agents.agent_oracle import fetch_market_risk_async, fetch_market_risk_batch
+
+
+# --- 3. Define the Tool using SpoonOS SDK ---
+class MarketRiskTool(BaseTool):
+    name: str = "check_market_risk"
+    description: str = "Fetches real-time market data and calculates risk score based on volatility"
+    parameters: dict = {
+        "type": "object",
+        "properties": {
+            "asset_symbol": {
+                "type": "string",
+                "description": "The cryptocurrency symbol to check (e.g., 'neo')"
+            },
+            "force_trigger": {
+                "type": "boolean",
+                "description": "Set to True to force a CRITICAL risk level (for demos)",
+                "default": False
+            }
+        },
+        "required": ["asset_symbol"]
+    }
+    
+    async def execute(self, asset_symbol: str = "neo", force_trigger: bool = False) -> dict:
+        """Execute the market risk check"""
+        report = await fetch_market_risk_async(asset_symbol, force_trigger)
+        return report.model_dump()
+
+class BatchMarketRiskTool(BaseTool):
+    name: str = "check_market_risk_batch"
+    description: str = "Fetches market data for many assets in one request and scores the risk of each"
+    parameters: dict = {
+        "type": "object",
+        "properties": {
+            "asset_symbols": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "The cryptocurrency symbols to check (e.g., ['neo', 'bitcoin'])"
+            },
+            "force_trigger": {
+                "type": "boolean",
+                "description": "Set to True to force a CRITICAL risk level (for demos)",
+                "default": False
+            }
+        },
+        "required": ["asset_symbols"]
+    }
+
+    async def execute(self, asset_symbols: list, force_trigger: bool = False) -> list:
+        """Execute the batch market risk check"""
+        reports = await fetch_market_risk_batch(asset_symbols, force_trigger)
+        return [report.model_dump() for report in reports]
+
+# --- 4. Define the Agent using SpoonOS SDK ---
+class OracleAgent(ToolCallAgent):
+    name: str = "The Watchtower"
+    description: str = "Monitors market volatility and signals when to hedge"
+    system_prompt: str = "You are an oracle agent that monitors cryptocurrency markets and alerts when hedging is needed."
+    max_steps: int = 5
+    available_tools: ToolManager = Field(
+        default_factory=lambda: ToolManager([MarketRiskTool(), BatchMarketRiskTool()])
+    )
@@ -0,0 +1,101 @@
+"""
+Risk classification rules shared by the Oracle agent and the offline backtest.
+
+Kept free of SDK / web imports so the backtest can run the exact same rules
+over millions of historical bars with nothing but NumPy. The rolling metrics
+(EWMA volatility over a window horizon, drawdown from the window high) are
+defined here too: agents/volatility.py updates them tick by tick, the backtest
+computes them for a whole series at once.
+"""
+import math
+
+import numpy as np
+
+# --- RISK THRESHOLDS (percent) ---
+# DEMO MODE: Very low thresholds so the demo always triggers a hedge.
+# Used for the 24h snapshot and the rolling metrics alike; `backtest.py --sweep` is the
+# place to calibrate separate ones before the rolling metrics get their own.
+CRITICAL_THRESHOLD_PCT = 0.1
+MEDIUM_THRESHOLD_PCT = 0.005
+
+LOW, MEDIUM, CRITICAL = 0, 1, 2
+RISK_LEVELS = np.array(["LOW", "MEDIUM", "CRITICAL"])
+
+
+def snapshot_metrics(price, high, low):
+    """
+    Drawdown from the high and swing range relative to the price, in percent.
+    Works on scalars or arrays (e.g. CoinGecko's high_24h / low_24h).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown_pct = ((high - price) / high) * 100
+        volatility_pct = ((high - low) / price) * 100
+    return drawdown_pct, volatility_pct
+
+
+def volatility_horizon(window: int) -> int:
+    """Returns in a full window of `window` ticks: the fixed horizon volatility is scaled to."""
+    return max(window - 1, 1)
+
+
+def horizon_volatility_pct(per_tick_var, window: int):
+    """Per-tick variance of log returns -> volatility over the window horizon, in percent."""
+    return np.sqrt(np.multiply(per_tick_var, volatility_horizon(window))) * 100
+
+
+def ewma_variance(returns: np.ndarray, ewma_lambda: float = 0.94) -> np.ndarray:
+    """
+    RiskMetrics EWMA variance after every return, seeded with the first squared return:
+    var[0] = r[0]^2, var[t] = lambda * var[t-1] + (1 - lambda) * r[t]^2.
+
+    Vectorized in blocks: inside a block the recursion is a scaled cumulative sum,
+    and only the carry between blocks is a Python loop (N / block iterations).
+    """
+    r2 = np.square(np.asarray(returns, dtype=np.float64))
+    n = len(r2)
+    if n == 0:
+        return r2
+    lam = ewma_lambda
+    if lam <= 0:
+        return r2
+    # Longest block whose lambda^-j scaling stays well inside float64 precision
+    block = max(1, min(4096, int(math.log(1e-8) / math.log(lam)))) if lam < 1 else 4096
+
+    pad = (-n) % block
+    x = np.concatenate([r2, np.zeros(pad)]).reshape(-1, block) * (1 - lam)
+    decay = lam ** np.arange(1, block + 1)  # lambda^(j+1)
+    # Zero-start filter of every block: y[j] = sum_{i<=j} lambda^(j-i) x[i]
+    y = np.cumsum(x / decay * lam, axis=1) * decay / lam
+
+    var = np.empty_like(y)
+    carry = r2[0]  # var[-1] = r[0]^2 makes var[0] = r[0]^2
+    for b in range(len(y)):
+        var[b] = y[b] + decay * carry
+        carry = var[b, -1]
+    return var.ravel()[:n]
+
+
+def rolling_metrics(close: np.ndarray, window_high: np.ndarray, window: int, ewma_lambda: float = 0.94):
+    """
+    The Oracle's rolling metrics at every tick of a price series, in percent:
+    drawdown from `window_high` (max price over the trailing `window` ticks) and
+    EWMA volatility of log returns over the window horizon. Same numbers as
+    agents/volatility.py after each tick (the first tick has no return: volatility 0).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown_pct = ((window_high - close) / window_high) * 100
+    volatility_pct = np.zeros_like(close)
+    if len(close) > 1:
+        var = ewma_variance(np.diff(np.log(close)), ewma_lambda)
+        volatility_pct[1:] = horizon_volatility_pct(var, window)
+    return drawdown_pct, volatility_pct
+
+
+def classify(drawdown_pct, volatility_pct,
+             critical_pct: float = CRITICAL_THRESHOLD_PCT,
+             medium_pct: float = MEDIUM_THRESHOLD_PCT) -> np.ndarray:
+    """Vectorized LOW / MEDIUM / CRITICAL codes (0 / 1 / 2) for every element."""
+    # fmax ignores NaN, so one bad metric does not hide the other (same as `a > t or b > t`)
+    score = np.fmax(drawdown_pct, volatility_pct)
+    return np.where(score > critical_pct, CRITICAL, np.where(score > medium_pct, MEDIUM, LOW)).astype(np.int8)
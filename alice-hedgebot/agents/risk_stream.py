@@ -0,0 +1,97 @@
+"""
+Push-based risk updates for the Oracle agent.
+
+The background poller publishes every new MarketRiskReport here; the broadcaster
+forwards it to subscribers ONLY when the asset's risk level changes or its volatility
+moves past a threshold. Upstream load is set by the poller, not by the number of clients.
+"""
+import asyncio
+import json
+from typing import Optional
+
+
+class Subscription:
+    """One streaming client: an asset filter and a bounded queue of reports."""
+
+    def __init__(self, assets: Optional[set] = None, queue_size: int = 100):
+        self.assets = frozenset(a.lower() for a in assets) if assets else None
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def wants(self, asset: str) -> bool:
+        return self.assets is None or asset.lower() in self.assets
+
+    def push(self, report: dict):
+        # A slow client loses its oldest update, never blocks the publisher
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(report)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class RiskBroadcaster:
+    def __init__(self, volatility_delta: float = 0.05, queue_size: int = 100):
+        """
+        Args:
+            volatility_delta: minimum volatility move (percentage points) that is worth an update.
+            queue_size: per-subscriber buffer before old updates are dropped.
+        """
+        self.volatility_delta = volatility_delta
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._latest = {}  # asset -> last published report
+
+    def subscribe(self, assets: Optional[set] = None) -> Subscription:
+        sub = Subscription(assets, self.queue_size)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def watched_assets(self) -> set:
+        """Assets explicitly requested by current subscribers."""
+        assets = set()
+        for sub in self._subscribers:
+            if sub.assets:
+                assets |= sub.assets
+        return assets
+
+    def latest(self, assets: Optional[set] = None) -> list:
+        """Last published report per asset, so new subscribers start with a snapshot."""
+        return [
+            r for a, r in self._latest.items()
+            if not assets or a in {x.lower() for x in assets}
+        ]
+
+    def should_publish(self, report: dict) -> bool:
+        if report["risk_level"] == "ERROR":
+            return False
+        previous = self._latest.get(report["asset"].lower())
+        if previous is None:
+            return True
+        if previous["risk_level"] != report["risk_level"]:
+            return True
+        return abs(report["volatility"] - previous["volatility"]) >= self.volatility_delta
+
+    def publish(self, report: dict) -> bool:
+        """Fan `report` out to interested subscribers if it is a meaningful change."""
+        if not self.should_publish(report):
+            return False
+        asset = report["asset"].lower()
+        self._latest[asset] = report
+        for sub in self._subscribers:
+            if sub.wants(asset):
+                sub.push(report)
+        return True
+
+
+def format_sse(report: dict, event: str = "risk") -> str:
+    """Encode a report as one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(report)}\n\n"
@@ -0,0 +1,180 @@
+"""
+Incremental rolling-volatility engine for the Oracle agent.
+
+Each asset keeps a fixed-size ring buffer of recent price ticks (NumPy float64),
+and every statistic is updated in O(1) per tick:
+- EWMA volatility of log returns (RiskMetrics style, lambda=0.94 by default)
+- Realized volatility over the window (running sum / sum of squares)
+  Both are scaled to a fixed horizon of `capacity - 1` ticks (the full window), so an
+  asset still filling its buffer reports the same unit as a warm one. The formulas are
+  shared with the backtest through agents/risk_rules.py.
+- Drawdown from the window high (monotonic deque) and max drawdown since tracking began
+
+Risk queries then read precomputed state instead of waiting on the network.
+"""
+import math
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from agents.risk_rules import horizon_volatility_pct, volatility_horizon
+
+
+class RollingVolatility:
+    """Rolling statistics over the last `capacity` price ticks of one asset."""
+
+    def __init__(self, capacity: int = 360, ewma_lambda: float = 0.94):
+        self.capacity = capacity
+        self.ewma_lambda = ewma_lambda
+        self._prices = np.zeros(capacity, dtype=np.float64)
+        self._returns = np.zeros(capacity, dtype=np.float64)
+        self._head = 0  # next write slot
+        self._count = 0  # prices currently in the window
+        self._ticks = 0  # prices seen since tracking began
+        self._sum_r = 0.0
+        self._sum_r2 = 0.0
+        self._ewma_var = 0.0
+        self._window_max = deque()  # (tick number, price), decreasing prices
+        self._peak = 0.0
+        self.max_drawdown_pct = 0.0
+        self.last_price = 0.0
+        self.updated_at = 0.0
+
+    def update(self, price: float, timestamp: Optional[float] = None):
+        """Push one price tick. O(1) (amortized for the window high)."""
+        if not price > 0:
+            return
+        slot = self._head
+
+        # --- Log return vs. the previous tick ---
+        r = math.log(price / self.last_price) if self._ticks else 0.0
+        if self._count == self.capacity:
+            # Slot is being overwritten: drop its return from the running sums
+            old = self._returns[slot]
+            self._sum_r -= old
+            self._sum_r2 -= old * old
+        self._returns[slot] = r
+        self._sum_r += r
+        self._sum_r2 += r * r
+        if self._ticks:
+            lam = self.ewma_lambda
+            self._ewma_var = r * r if self._ticks == 1 else lam * self._ewma_var + (1 - lam) * r * r
+
+        self._prices[slot] = price
+        self._head = (slot + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+        # --- Window high (monotonic deque) ---
+        tick = self._ticks
+        while self._window_max and self._window_max[-1][1] <= price:
+            self._window_max.pop()
+        self._window_max.append((tick, price))
+        while self._window_max[0][0] <= tick - self.capacity:
+            self._window_max.popleft()
+
+        # --- Max drawdown since tracking began ---
+        self._peak = max(self._peak, price)
+        self.max_drawdown_pct = max(
+            self.max_drawdown_pct, (self._peak - price) / self._peak * 100
+        )
+
+        self._ticks += 1
+        self.last_price = price
+        self.updated_at = time.time() if timestamp is None else timestamp
+
+        if self._head == 0:
+            # Once per lap, rebuild the running sums to stop float drift (amortized O(1))
+            window = self._returns[: self._count]
+            self._sum_r = float(window.sum())
+            self._sum_r2 = float(np.dot(window, window))
+
+    @property
+    def ticks(self) -> int:
+        return self._ticks
+
+    @property
+    def n_returns(self) -> int:
+        # The oldest price in the window has no return inside the window
+        return min(self._ticks, self.capacity) - 1 if self._ticks else 0
+
+    @property
+    def horizon_ticks(self) -> int:
+        """Returns in a full window: the fixed horizon volatility is scaled to."""
+        return volatility_horizon(self.capacity)
+
+    @property
+    def window_high(self) -> float:
+        return self._window_max[0][1] if self._window_max else 0.0
+
+    @property
+    def drawdown_pct(self) -> float:
+        """Drawdown of the last price from the window high, in percent."""
+        high = self.window_high
+        return (high - self.last_price) / high * 100 if high else 0.0
+
+    @property
+    def ewma_volatility_pct(self) -> float:
+        """EWMA per-tick volatility scaled to the window horizon, in percent."""
+        return float(horizon_volatility_pct(self._ewma_var, self.capacity))
+
+    @property
+    def realized_volatility_pct(self) -> float:
+        """Realized volatility (sample std of log returns) over the window horizon, in percent."""
+        n = self.n_returns
+        if n < 2:
+            return 0.0
+        # The window's oldest slot holds a return from outside the window once full
+        sum_r, sum_r2 = self._sum_r, self._sum_r2
+        if self._count == self.capacity:
+            oldest = self._returns[self._head]
+            sum_r -= oldest
+            sum_r2 -= oldest * oldest
+        var = max((sum_r2 - sum_r * sum_r / n) / (n - 1), 0.0)
+        return float(horizon_volatility_pct(var, self.capacity))
+
+    def snapshot(self) -> dict:
+        return {
+            "last_price": self.last_price,
+            "ticks": self._ticks,
+            "window_ticks": self._count,
+            "window_high": self.window_high,
+            "drawdown_pct": self.drawdown_pct,
+            "max_drawdown_pct": self.max_drawdown_pct,
+            "ewma_volatility_pct": self.ewma_volatility_pct,
+            "realized_volatility_pct": self.realized_volatility_pct,
+            "updated_at": self.updated_at,
+        }
+
+
+class VolatilityEngine:
+    """Per-asset RollingVolatility state."""
+
+    def __init__(self, capacity: int = 360, ewma_lambda: float = 0.94, min_ticks: int = 30):
+        """
+        Args:
+            capacity: ticks kept per asset (fixed memory).
+            ewma_lambda: EWMA decay factor.
+            min_ticks: ticks needed before the engine's numbers are trusted.
+        """
+        self.capacity = capacity
+        self.ewma_lambda = ewma_lambda
+        self.min_ticks = min_ticks
+        self._assets = {}
+
+    def update(self, asset: str, price: float, timestamp: Optional[float] = None) -> RollingVolatility:
+        asset = asset.lower()
+        state = self._assets.get(asset)
+        if state is None:
+            state = self._assets[asset] = RollingVolatility(self.capacity, self.ewma_lambda)
+        state.update(price, timestamp)
+        return state
+
+    def get(self, asset: str) -> Optional[RollingVolatility]:
+        return self._assets.get(asset.lower())
+
+    def ready(self, asset: str) -> Optional[RollingVolatility]:
+        """The asset's state if it has seen at least `min_ticks` ticks, else None."""
+        state = self.get(asset)
+        return state if state is not None and state.ticks >= self.min_ticks else None
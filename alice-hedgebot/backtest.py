@@ -0,0 +1,214 @@
+"""
+Offline backtest for the Oracle's risk thresholds.
+
+Replays the Oracle's drawdown / volatility classification (agents/risk_rules.py) over
+long historical OHLC series loaded from memory-mapped NPY files (CSV is converted to
+NPY once, then memory-mapped too). Everything is vectorized NumPy, so a sweep over a
+grid of thresholds on millions of bars runs in seconds on a laptop, with no network.
+
+Two metric sets, like the Oracle: the 24h snapshot (drawdown from the window high,
+high/low swing) or, with `--metrics rolling`, the volatility engine's (drawdown from
+the window high of closes, EWMA volatility over the window horizon, one tick per bar).
+
+For every deposit the backtest reports whether a hedge would trigger, what it costs in
+GAS (HedgeTool's unit rule + per-transaction fees) and how much value it protects
+(the drawdown the deposit would have suffered over the following bars).
+
+Usage:
+    python3 alice-hedgebot/backtest.py prices.csv
+    python3 alice-hedgebot/backtest.py prices.npy --window 1440 --horizon 60 --sweep
+    python3 alice-hedgebot/backtest.py prices.npy --metrics rolling --window 360
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from agents.risk_rules import (
+    CRITICAL_THRESHOLD_PCT, MEDIUM_THRESHOLD_PCT,
+    rolling_metrics, snapshot_metrics,
+)
+
+# Same rule as HedgeTool: 1 USD = 1 unit = 10^-8 GAS
+GAS_UNITS = 100_000_000
+# Typical GAS self-transfer on Neo N3: ~0.0100 system fee + ~0.0012 network fee
+DEFAULT_FEE_GAS = 0.0112
+
+OHLC_COLUMNS = ("open", "high", "low", "close")
+
+
+# --- 1. DATA LOADING ---
+def load_ohlc(path: str) -> np.ndarray:
+    """
+    Memory-map an (N, 4) float64 array of open/high/low/close bars.
+    `.npy` files are mapped directly; a `.csv` (header with open,high,low,close columns)
+    is parsed once and cached next to it as `<file>.npy`.
+    """
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+
+    cached = path + ".npy"
+    if not os.path.exists(cached) or os.path.getmtime(cached) < os.path.getmtime(path):
+        with open(path) as f:
+            header = [h.strip().lower() for h in f.readline().split(",")]
+        missing = [c for c in OHLC_COLUMNS if c not in header]
+        if missing:
+            raise ValueError(f"{path}: missing columns {missing} (found {header})")
+        bars = np.loadtxt(
+            path, delimiter=",", skiprows=1, dtype=np.float64,
+            usecols=[header.index(c) for c in OHLC_COLUMNS], ndmin=2,
+        )
+        np.save(cached, bars)
+    return np.load(cached, mmap_mode="r")
+
+
+# --- 2. VECTORIZED WINDOW HELPERS ---
+def rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Max over the trailing `window` values (including the current one), O(N) for any window
+    (van Herk / Gil-Werman: block prefix + suffix maxima). The first bars use what is available.
+    """
+    n = len(x)
+    window = max(1, min(window, n))
+    padded = np.concatenate([np.full(window - 1, -np.inf), x])
+    pad_end = (-len(padded)) % window
+    blocks = np.concatenate([padded, np.full(pad_end, -np.inf)]).reshape(-1, window)
+
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    ends = np.arange(window - 1, window - 1 + n)
+    return np.maximum(suffix[ends - window + 1], prefix[ends])
+
+
+def rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    return -rolling_max(-x, window)
+
+
+def forward_drawdown_pct(close: np.ndarray, horizon: int) -> np.ndarray:
+    """Worst fall below each bar's close over the next `horizon` bars, in percent (>= 0)."""
+    future_min = rolling_min(close[::-1], horizon + 1)[::-1]
+    return np.maximum((close - future_min) / close, 0.0) * 100
+
+
+# --- 3. BACKTEST ---
+def risk_metrics(bars: np.ndarray, window: int, metrics: str = "snapshot", ewma_lambda: float = 0.94):
+    """
+    The Oracle's metrics at every bar over a trailing `window`:
+    "snapshot" - 24h-style high/low metrics (bar highs and lows),
+    "rolling"  - the volatility engine's drawdown from the window high and EWMA volatility
+                 (closes as ticks, `window` = the engine's ORACLE_VOL_WINDOW).
+    """
+    close = np.asarray(bars[:, 3], dtype=np.float64)
+    if metrics == "rolling":
+        drawdown_pct, volatility_pct = rolling_metrics(close, rolling_max(close, window), window, ewma_lambda)
+        return close, drawdown_pct, volatility_pct
+    if metrics != "snapshot":
+        raise ValueError(f"Unknown metrics '{metrics}' (snapshot or rolling)")
+    high = rolling_max(np.asarray(bars[:, 1], dtype=np.float64), window)
+    low = rolling_min(np.asarray(bars[:, 2], dtype=np.float64), window)
+    drawdown_pct, volatility_pct = snapshot_metrics(close, high, low)
+    return close, drawdown_pct, volatility_pct
+
+
+def sweep(bars: np.ndarray, critical_grid, medium_grid, window: int = 1440, horizon: int = 60,
+          deposit_every: int = 60, deposit_usd: float = 10_000.0, fee_gas: float = DEFAULT_FEE_GAS,
+          hedge_on_medium: bool = True, metrics: str = "snapshot", ewma_lambda: float = 0.94) -> list:
+    """
+    Evaluate every (critical, medium) threshold pair with critical >= medium.
+
+    A deposit of `deposit_usd` arrives every `deposit_every` bars. It is hedged when the
+    Oracle says HEDGE_NOW, i.e. risk above `medium` (demo mode) or above `critical`
+    (`hedge_on_medium=False`). Each pair costs O(log N) after one O(N log N) sort.
+    `metrics` / `ewma_lambda` pick the Oracle's metrics, see `risk_metrics`.
+    """
+    close, drawdown_pct, volatility_pct = risk_metrics(bars, window, metrics, ewma_lambda)
+    loss_pct = forward_drawdown_pct(close, horizon)
+
+    deposits = np.arange(window - 1, len(close), deposit_every)
+    score = np.fmax(drawdown_pct[deposits], volatility_pct[deposits])
+    score = np.nan_to_num(score, nan=-np.inf)
+    protected = deposit_usd * loss_pct[deposits] / 100
+
+    # Sorted scores + suffix sums: "how many / how much above threshold t" via searchsorted
+    order = np.argsort(score)
+    sorted_score = score[order]
+    protected_above = np.concatenate([np.cumsum(protected[order][::-1])[::-1], [0.0]])
+    n = len(deposits)
+
+    def above(threshold):
+        return n - np.searchsorted(sorted_score, threshold, side="right")
+
+    units_per_hedge = int(deposit_usd)
+    results = []
+    for critical in critical_grid:
+        for medium in medium_grid:
+            if medium > critical:
+                continue
+            hedge_threshold = medium if hedge_on_medium else critical
+            hedges = int(above(hedge_threshold))
+            critical_count = int(above(critical))
+            results.append({
+                "critical_pct": float(critical),
+                "medium_pct": float(medium),
+                "deposits": n,
+                "hedges": hedges,
+                "trigger_rate": hedges / n if n else 0.0,
+                "critical": critical_count,
+                "medium": int(above(medium)) - critical_count,
+                "gas_fees": hedges * fee_gas,
+                "gas_locked": hedges * units_per_hedge / GAS_UNITS,
+                "protected_usd": float(protected_above[n - hedges]),
+            })
+    return results
+
+
+def print_table(results: list):
+    print(f"{'critical%':>10} {'medium%':>9} {'hedges':>8} {'trigger':>8} {'CRIT':>7} {'MED':>7} "
+          f"{'fees GAS':>10} {'locked GAS':>11} {'protected $':>14} {'$/GAS fee':>10}")
+    for r in results:
+        per_gas = r["protected_usd"] / r["gas_fees"] if r["gas_fees"] else 0.0
+        print(f"{r['critical_pct']:>10.4f} {r['medium_pct']:>9.4f} {r['hedges']:>8} {r['trigger_rate']:>8.1%} "
+              f"{r['critical']:>7} {r['medium']:>7} {r['gas_fees']:>10.4f} {r['gas_locked']:>11.6f} "
+              f"{r['protected_usd']:>14,.2f} {per_gas:>10,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the Oracle's risk thresholds on historical OHLC bars")
+    parser.add_argument("path", help="OHLC data: .npy (N x 4) or .csv with open,high,low,close columns")
+    parser.add_argument("--window", type=int, default=1440,
+                        help="bars in the high/low window (1440 = 24h of 1m bars); with --metrics rolling, the engine window")
+    parser.add_argument("--metrics", choices=("snapshot", "rolling"), default="snapshot",
+                        help="24h snapshot metrics, or the rolling engine's (EWMA volatility, window drawdown)")
+    parser.add_argument("--ewma-lambda", type=float, default=0.94, help="EWMA decay for --metrics rolling")
+    parser.add_argument("--horizon", type=int, default=60, help="bars after a deposit used to measure the avoided loss")
+    parser.add_argument("--deposit-every", type=int, default=60, help="bars between simulated deposits")
+    parser.add_argument("--deposit-usd", type=float, default=10_000.0, help="size of each deposit")
+    parser.add_argument("--fee-gas", type=float, default=DEFAULT_FEE_GAS, help="GAS fees per hedge transaction")
+    parser.add_argument("--hold-on-medium", action="store_true", help="only CRITICAL hedges (production mode)")
+    parser.add_argument("--sweep", action="store_true", help="sweep a log-spaced grid instead of the live thresholds")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    bars = load_ohlc(args.path)
+    print(f"📂 Loaded {len(bars):,} bars in {time.perf_counter() - start:.2f}s")
+
+    if args.sweep:
+        grid = np.round(np.logspace(-3, 1, 17), 4)  # 0.001% .. 10%
+        critical_grid, medium_grid = grid, grid
+    else:
+        critical_grid, medium_grid = [CRITICAL_THRESHOLD_PCT], [MEDIUM_THRESHOLD_PCT]
+
+    start = time.perf_counter()
+    results = sweep(
+        bars, critical_grid, medium_grid,
+        window=args.window, horizon=args.horizon, deposit_every=args.deposit_every,
+        deposit_usd=args.deposit_usd, fee_gas=args.fee_gas, hedge_on_medium=not args.hold_on_medium,
+        metrics=args.metrics, ewma_lambda=args.ewma_lambda,
+    )
+    print(f"⚙️  Evaluated {len(results)} threshold pairs in {time.perf_counter() - start:.2f}s\n")
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
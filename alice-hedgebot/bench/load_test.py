@@ -0,0 +1,259 @@
+"""
+Load test / latency benchmark for the Oracle (/market-risk) and Executor (/hedge) agents.
+
+Starts the local stand-ins (bench/stand_ins.py) and both agents pointed at them, then drives
+the endpoints with closed-loop workers at a target concurrency, fully offline.
+Reports throughput, p50/p95/p99 latency, errors (with the first few messages) and the
+upstream calls each run caused.
+For /hedge, "accept" is the 202 round-trip and "complete" is until the job has finished
+(polled through /hedge/jobs/{job_id}).
+
+Usage (from alice-hedgebot/):
+    python3 -m bench.load_test --concurrency 50 --requests 2000
+    python3 -m bench.load_test --target hedge --duration 30 --rpc-latency-ms 80 --rpc-error-rate 0.01
+    python3 -m bench.load_test --no-spawn   # agents / stand-ins already running
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ORACLE_URL = "http://127.0.0.1:8001"
+EXECUTOR_URL = "http://127.0.0.1:8000"
+
+
+# --- 1. PROCESS MANAGEMENT ---
+def port_in_use(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+def spawn(args, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args], cwd=ROOT, env={**os.environ, "PYTHONUNBUFFERED": "1", **env},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+async def stats(client: httpx.AsyncClient, url: str) -> dict:
+    try:
+        return (await client.get(f"{url}/_stats")).json()
+    except Exception:
+        return {}
+
+
+# --- 2. WORKLOADS ---
+class Run:
+    """Latencies (seconds), error count and the first error messages for one endpoint."""
+
+    def __init__(self, name: str, max_error_samples: int = 5):
+        self.name = name
+        self.latencies = {}  # phase -> [seconds]
+        self.errors = 0
+        self.error_samples = []  # first `max_error_samples` messages, in order
+        self.max_error_samples = max_error_samples
+        self.started = self.finished = 0.0
+
+    def record(self, phase: str, seconds: float):
+        self.latencies.setdefault(phase, []).append(seconds)
+
+    def fail(self, message: str):
+        self.errors += 1
+        if len(self.error_samples) < self.max_error_samples:
+            self.error_samples.append(message)
+
+
+async def drive(run: Run, call, concurrency: int, requests: int, duration: float):
+    """
+    Closed loop: `concurrency` workers, each sends its next request when the previous one returns.
+    `call(i)` returns None on success, else an error message.
+    """
+    counter = itertools.count()
+    deadline = time.monotonic() + duration if duration else None
+
+    async def worker():
+        while True:
+            i = next(counter)
+            if (requests and i >= requests) or (deadline and time.monotonic() >= deadline):
+                return
+            try:
+                error = await call(i)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            if error:
+                run.fail(error)
+
+    run.started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    run.finished = time.perf_counter()
+
+
+def market_risk_call(client: httpx.AsyncClient, run: Run, assets: list):
+    async def call(i: int):
+        asset = assets[i % len(assets)]
+        start = time.perf_counter()
+        response = await client.post(f"{ORACLE_URL}/market-risk", json={"asset_symbol": asset})
+        run.record("request", time.perf_counter() - start)
+        if response.status_code != 200:
+            return f"HTTP {response.status_code}: {response.text[:200]}"
+        if response.json().get("risk_level") == "ERROR":
+            return f"{asset}: risk_level ERROR"
+        return None
+    return call
+
+
+def hedge_call(client: httpx.AsyncClient, run: Run, poll_interval: float):
+    async def call(i: int):
+        start = time.perf_counter()
+        response = await client.post(
+            f"{EXECUTOR_URL}/hedge",
+            json={"amount_usd": 10 + i % 90, "idempotency_key": uuid.uuid4().hex},
+        )
+        run.record("accept", time.perf_counter() - start)
+        if response.status_code != 202:
+            return f"HTTP {response.status_code}: {response.text[:200]}"
+
+        status_url = EXECUTOR_URL + response.json()["status_url"]
+        while True:
+            job = (await client.get(status_url)).json()
+            if job.get("status") in ("SUCCEEDED", "FAILED"):
+                break
+            await asyncio.sleep(poll_interval)
+        run.record("complete", time.perf_counter() - start)
+        result = job.get("result") or {}
+        if job["status"] != "SUCCEEDED" or result.get("status") != "SUCCESS":
+            return f"job {job['status']}: {result.get('error', result)}"
+        return None
+    return call
+
+
+# --- 3. REPORT ---
+def report(run: Run, upstream: dict):
+    elapsed = run.finished - run.started
+    total = max((len(v) for v in run.latencies.values()), default=0)
+    print(f"\n📊 {run.name}: {total} requests in {elapsed:.2f}s "
+          f"→ {total / elapsed if elapsed else 0:.1f} req/s, {run.errors} errors")
+    for phase, values in run.latencies.items():
+        p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+        print(f"   {phase:<9} p50 {p50:8.1f} ms   p95 {p95:8.1f} ms   p99 {p99:8.1f} ms")
+    for message in run.error_samples:
+        print(f"   ❌ {message}")
+    if run.errors > len(run.error_samples):
+        print(f"   ... and {run.errors - len(run.error_samples)} more errors")
+    if upstream:
+        print("   upstream " + ", ".join(f"{k}={v}" for k, v in sorted(upstream.items())))
+
+
+def delta(before: dict, after: dict) -> dict:
+    return {k: v - before.get(k, 0) for k, v in after.items()
+            if isinstance(v, int) and k not in ("height", "mempool") and v != before.get(k, 0)}
+
+
+async def main_async(args):
+    coingecko = f"http://127.0.0.1:{args.coingecko_port}"
+    rpc = f"http://127.0.0.1:{args.rpc_port}"
+    processes = []
+    # Fake hedges go to a throwaway ledger, never the hedges.db a real executor resumes from
+    ledger_dir = tempfile.TemporaryDirectory(prefix="hedgebot-bench-")
+    if not args.no_spawn:
+        # A stale agent or stand-in on one of the ports would silently serve the whole run
+        busy = [port for port in (args.coingecko_port, args.rpc_port, 8001, 8000) if port_in_use(port)]
+        if busy:
+            ledger_dir.cleanup()
+            raise SystemExit(f"❌ Ports already in use: {busy} (stop those processes, or pass --no-spawn)")
+        processes.append(spawn([
+            "-m", "bench.stand_ins",
+            "--coingecko-port", str(args.coingecko_port), "--rpc-port", str(args.rpc_port),
+            "--latency-ms", str(args.latency_ms), "--error-rate", str(args.error_rate),
+            "--rpc-latency-ms", str(args.rpc_latency_ms), "--rpc-error-rate", str(args.rpc_error_rate),
+            "--block-time", str(args.block_time),
+        ], {}))
+        agent_env = {
+            "ORACLE_COINGECKO_URL": f"{coingecko}/api/v3/coins/markets",
+            "NEO_RPC_URL": rpc,
+            "NEO_BLOCK_POLL_INTERVAL": str(args.block_time),
+            "HEDGE_LEDGER_PATH": os.path.join(ledger_dir.name, "hedges.db"),
+        }
+        if args.target in ("all", "market-risk"):
+            processes.append(spawn(["agents/agent_oracle.py"], agent_env))
+        if args.target in ("all", "hedge"):
+            processes.append(spawn(["agents/agentb.py"], agent_env))
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    try:
+        async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+            await wait_ready(client, f"{coingecko}/_stats")
+            await wait_ready(client, f"{rpc}/_stats")
+            print(f"🚀 {args.concurrency} concurrent clients, "
+                  f"{f'{args.requests} requests' if not args.duration else f'{args.duration}s'} per endpoint")
+
+            if args.target in ("all", "market-risk"):
+                await wait_ready(client, f"{ORACLE_URL}/docs")
+                run = Run("POST /market-risk")
+                assets = [a.strip() for a in args.assets.split(",") if a.strip()]
+                before = await stats(client, coingecko)
+                await drive(run, market_risk_call(client, run, assets), args.concurrency, args.requests, args.duration)
+                report(run, delta(before, await stats(client, coingecko)))
+
+            if args.target in ("all", "hedge"):
+                await wait_ready(client, f"{EXECUTOR_URL}/docs")
+                run = Run("POST /hedge")
+                before = await stats(client, rpc)
+                await drive(run, hedge_call(client, run, args.poll_interval), args.concurrency, args.requests, args.duration)
+                report(run, delta(before, await stats(client, rpc)))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+        ledger_dir.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for /market-risk and /hedge")
+    parser.add_argument("--target", choices=["all", "market-risk", "hedge"], default="all")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent closed-loop clients")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--duration", type=float, default=0, help="run for N seconds instead of --requests")
+    parser.add_argument("--assets", default="neo,gas,bitcoin,ethereum", help="assets cycled by /market-risk")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="seconds between /hedge/jobs polls")
+    parser.add_argument("--no-spawn", action="store_true", help="use already running stand-ins and agents")
+    parser.add_argument("--coingecko-port", type=int, default=9001)
+    parser.add_argument("--rpc-port", type=int, default=9002)
+    parser.add_argument("--latency-ms", type=float, default=50, help="fake CoinGecko latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake CoinGecko error rate (0..1)")
+    parser.add_argument("--rpc-latency-ms", type=float, default=20, help="fake Neo RPC latency per HTTP request")
+    parser.add_argument("--rpc-error-rate", type=float, default=0.0, help="fake Neo RPC error rate per call (0..1)")
+    parser.add_argument("--block-time", type=float, default=1.0, help="seconds between fake blocks")
+    args = parser.parse_args()
+    if args.duration:
+        args.requests = 0
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
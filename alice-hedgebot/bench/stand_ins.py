@@ -0,0 +1,205 @@
+"""
+Local stand-ins for the agents' upstreams, for offline benchmarks.
+
+- Fake CoinGecko: `GET /api/v3/coins/markets` (ids, per_page, page) with random-walk prices.
+- Fake Neo N3 node: JSON-RPC (single + batch) for getversion, getblockcount, invokescript,
+  calculatenetworkfee, sendrawtransaction, getapplicationlog and gettransactionheight.
+  A new block is produced every `block_time` seconds and includes the whole mempool.
+
+Both take a configurable latency (per HTTP request) and error rate.
+`GET /_stats` on either server returns request counts, so the load test can report
+how many upstream calls a run actually caused.
+
+Usage:
+    python3 -m bench.stand_ins --coingecko-port 9001 --rpc-port 9002 --latency-ms 50 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, suppress
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+# --- 1. FAKE COINGECKO ---
+def create_coingecko_app(latency: float = 0.05, error_rate: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Fake CoinGecko")
+    stats = Counter()
+    prices = {}
+
+    def quote(asset: str) -> dict:
+        # Geometric random walk per asset, moved on every request
+        price = prices.get(asset, 10.0 + (sum(map(ord, asset)) % 90))
+        price *= 1 + random.gauss(0, 0.002)
+        prices[asset] = price
+        return {
+            "id": asset,
+            "symbol": asset[:4],
+            "current_price": round(price, 6),
+            "high_24h": round(price * 1.03, 6),
+            "low_24h": round(price * 0.97, 6),
+            "price_change_percentage_24h": random.uniform(-5, 5),
+            "last_updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+
+    @app.get("/api/v3/coins/markets")
+    async def markets(ids: str = "", per_page: int = 100, page: int = 1):
+        stats["coins/markets"] += 1
+        await asyncio.sleep(latency)
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(status_code=429, content={"status": {"error_code": 429, "error_message": "Simulated rate limit"}})
+
+        assets = [a for a in ids.split(",") if a]
+        start = (page - 1) * per_page
+        return [quote(a) for a in assets[start:start + per_page]]
+
+    @app.get("/_stats")
+    async def get_stats():
+        return dict(stats)
+
+    return app
+
+
+# --- 2. FAKE NEO N3 NODE ---
+def create_neo_rpc_app(latency: float = 0.02, error_rate: float = 0.0, block_time: float = 1.0,
+                       start_height: int = 1_000_000) -> FastAPI:
+    stats = Counter()
+    chain = {"height": start_height, "mempool": set(), "included": {}}
+
+    async def produce_blocks():
+        while True:
+            await asyncio.sleep(block_time)
+            block_index = chain["height"]
+            for tx_hash in chain["mempool"]:
+                chain["included"][tx_hash] = block_index
+            chain["mempool"] = set()
+            chain["height"] += 1
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        producer = asyncio.create_task(produce_blocks())
+        try:
+            yield
+        finally:
+            producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
+
+    app = FastAPI(title="Fake Neo N3 RPC", lifespan=lifespan)
+
+    def unknown():
+        raise KeyError("Unknown transaction")
+
+    def handle(method: str, params: list):
+        if method == "getversion":
+            return {
+                "tcpport": 20333, "nonce": 1, "useragent": "/FakeNeo:3.6.0/",
+                "protocol": {
+                    "addressversion": 53, "network": 894710606, "validatorscount": 7,
+                    "msperblock": int(block_time * 1000), "maxtraceableblocks": 2102400,
+                    "maxvaliduntilblockincrement": 5760, "maxtransactionsperblock": 512,
+                    "memorypoolmaxtransactions": 50000, "initialgasdistribution": 5200000000000000,
+                    "hardforks": [],
+                },
+                "rpc": {"maxiteratorresultitems": 100, "sessionenabled": False},
+            }
+        if method == "getblockcount":
+            return chain["height"]
+        if method == "invokescript":
+            return {
+                "script": params[0], "state": "HALT", "gasconsumed": "997775", "exception": None,
+                "notifications": [], "stack": [{"type": "Boolean", "value": True}],
+            }
+        if method == "calculatenetworkfee":
+            return {"networkfee": "123000"}
+        if method == "sendrawtransaction":
+            tx_hash = "0x" + hashlib.sha256(params[0].encode()).hexdigest()
+            chain["mempool"].add(tx_hash)
+            return {"hash": tx_hash}
+        if method == "getapplicationlog":
+            if params[0] not in chain["included"]:
+                unknown()
+            return {
+                "txid": params[0],
+                "executions": [{
+                    "trigger": "Application", "vmstate": "HALT", "exception": None,
+                    "gasconsumed": "997775", "stack": [], "notifications": [],
+                }],
+            }
+        if method == "gettransactionheight":
+            if params[0] not in chain["included"]:
+                unknown()
+            return chain["included"][params[0]]
+        raise NotImplementedError(method)
+
+    def call(body: dict) -> dict:
+        method = body.get("method", "")
+        stats[method] += 1
+        reply = {"jsonrpc": "2.0", "id": body.get("id")}
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            reply["error"] = {"code": -500, "message": "Simulated node failure"}
+            return reply
+        try:
+            reply["result"] = handle(method, body.get("params") or [])
+        except KeyError as e:
+            reply["error"] = {"code": -100, "message": e.args[0]}
+        except NotImplementedError:
+            reply["error"] = {"code": -32601, "message": f"Method not found: {method}"}
+        return reply
+
+    @app.post("/")
+    async def rpc(request: Request):
+        body = await request.json()
+        stats["http_requests"] += 1
+        await asyncio.sleep(latency)
+        if isinstance(body, list):
+            stats["batches"] += 1
+            return [call(b) for b in body]
+        return call(body)
+
+    @app.get("/_stats")
+    async def get_stats():
+        return {**stats, "height": chain["height"], "mempool": len(chain["mempool"])}
+
+    return app
+
+
+# --- 3. RUNNER ---
+async def serve(coingecko_port: int, rpc_port: int, latency: float, error_rate: float,
+                rpc_latency: float, rpc_error_rate: float, block_time: float):
+    servers = [
+        uvicorn.Server(uvicorn.Config(
+            create_coingecko_app(latency, error_rate), host="127.0.0.1", port=coingecko_port, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(
+            create_neo_rpc_app(rpc_latency, rpc_error_rate, block_time), host="127.0.0.1", port=rpc_port, log_level="warning")),
+    ]
+    print(f"🧪 Fake CoinGecko on :{coingecko_port}, fake Neo RPC on :{rpc_port}")
+    await asyncio.gather(*(s.serve() for s in servers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local CoinGecko and Neo N3 RPC stand-ins")
+    parser.add_argument("--coingecko-port", type=int, default=9001)
+    parser.add_argument("--rpc-port", type=int, default=9002)
+    parser.add_argument("--latency-ms", type=float, default=50, help="fake CoinGecko latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake CoinGecko error rate (0..1)")
+    parser.add_argument("--rpc-latency-ms", type=float, default=20, help="fake Neo RPC latency per HTTP request")
+    parser.add_argument("--rpc-error-rate", type=float, default=0.0, help="fake Neo RPC error rate per call (0..1)")
+    parser.add_argument("--block-time", type=float, default=1.0, help="seconds between fake blocks")
+    args = parser.parse_args()
+
+    asyncio.run(serve(
+        args.coingecko_port, args.rpc_port, args.latency_ms / 1000, args.error_rate,
+        args.rpc_latency_ms / 1000, args.rpc_error_rate, args.block_time,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# test_trigger.py is a manual script that queries the live CoinGecko API at import, not a test module
+collect_ignore = ["test_trigger.py"]
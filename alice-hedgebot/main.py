@@ -0,0 +1,165 @@
+"""
+Alice HedgeBot - single-process orchestrator.
+
+Runs the Oracle (Agent A) and the Executor (Agent B) in ONE asyncio process.
+`POST /deposit` checks market risk and queues the hedge on the Executor's job queue in
+memory - no HTTP hop between the agents and no browser in the middle. Risk changes found by
+the Oracle's poller are pushed straight to the Executor (`agentb.on_risk_signal`), so a
+CRITICAL signal reaches it as soon as it is computed; per-request reports never are.
+Every per-agent endpoint (/market-risk, /hedge, ...) is served here as well, and each
+agent can still run on its own port.
+"""
+import asyncio
+import os
+import time
+
+_import_started = time.perf_counter()
+
+from contextlib import AsyncExitStack, asynccontextmanager
+
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+# Before the agents read their settings: a .env file (see README) fills in whatever is unset
+load_dotenv()
+
+from agents import agent_oracle, agentb, metrics
+from agents.hedge_jobs import QueueFullError
+from agents.logs import get_logger
+from agents.metrics import ERRORS, HTTP_LATENCY
+
+log = get_logger("orchestrator")
+
+PORT = int(os.getenv("HEDGEBOT_PORT", "8080"))
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
+
+async def forward_risk_signals(sub):
+    """In-process subscriber to the Oracle's poller: hands every pushed report to the Executor."""
+    while True:
+        report = await sub.get()
+        try:
+            await agentb.on_risk_signal(report)
+        except Exception as e:
+            ERRORS.inc(component="risk_signal")
+            log.warning(f"⚠️ Risk signal for {report.get('asset')} not handled: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start both agents' background machinery (poller, chain session, workers, ...)
+    start = time.perf_counter()
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(agent_oracle.lifespan(agent_oracle.app))
+        await stack.enter_async_context(agentb.lifespan(agentb.app))
+
+        sub = agent_oracle.poller_stream.subscribe()
+        forwarder = asyncio.create_task(forward_risk_signals(sub))
+        stack.callback(agent_oracle.poller_stream.unsubscribe, sub)
+        stack.callback(forwarder.cancel)
+        startup_ms = (time.perf_counter() - start) * 1000
+        log.info(
+            f"🚀 HedgeBot ready: imports {IMPORT_SECONDS * 1000:.0f} ms, startup {startup_ms:.0f} ms",
+            extra={"import_ms": round(IMPORT_SECONDS * 1000, 1), "startup_ms": round(startup_ms, 1)},
+        )
+        yield
+
+
+app = FastAPI(title="Alice HedgeBot", lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Serve the existing per-agent endpoints from this process too
+# (both agents expose the same process-wide /metrics, so keep the first copy only)
+_served = set()
+for agent_app in (agent_oracle.app, agentb.app):
+    for route in agent_app.routes:
+        if isinstance(route, APIRoute) and (route.path, frozenset(route.methods)) not in _served:
+            _served.add((route.path, frozenset(route.methods)))
+            app.router.routes.append(route)
+
+
+@app.post("/deposit")
+@metrics.timed(HTTP_LATENCY, endpoint="/deposit")
+async def deposit_endpoint(request: Request):
+    """
+    Deposit workflow: Oracle risk check -> queue a hedge only if it says HEDGE_NOW.
+    A queued hedge answers 202 with its job, like POST /hedge; poll `status_url` for the result.
+    Send an `Idempotency-Key` header (or `idempotency_key` field) so retries never hedge twice.
+    """
+    try:
+        amount = 10.0 # Default
+        symbol = "neo"
+        idempotency_key = request.headers.get("Idempotency-Key")
+
+        try:
+            body = await request.json()
+            if body and "amount_usd" in body:
+                amount = float(body["amount_usd"])
+            if body and "asset_symbol" in body:
+                symbol = body["asset_symbol"]
+            if body:
+                idempotency_key = body.get("idempotency_key", idempotency_key)
+        except Exception:
+            pass
+
+        # A retry of a deposit that already hedged gets its job back, whatever the risk is now
+        if idempotency_key:
+            job = await agentb.hedge_jobs.find_by_key(idempotency_key)
+            if job is not None:
+                log.info(f"♻️ Duplicate deposit, returning job {job.job_id}", extra={"job_id": job.job_id})
+                return hedge_job_response(None, job, created=False)
+
+        log.info(f"💰 NEW DEPOSIT: ${amount} ({symbol})", extra={"amount_usd": amount, "asset": symbol})
+
+        # 1. Agent A: risk check, straight from memory/cache
+        report = await agent_oracle.fetch_market_risk_async(symbol)
+        agent_oracle.publish_reports([report])
+
+        if report.recommendation != "HEDGE_NOW":
+            log.info(f"🟢 Risk {report.risk_level}: holding", extra={"asset": symbol, "risk_level": report.risk_level})
+            return {"risk": report.model_dump(), "hedged": False, "hedge": None}
+
+        # 2. Agent B: queue the hedge in-process (same queue, dedup and backpressure as /hedge)
+        try:
+            job, created = await agentb.hedge_jobs.submit(amount, idempotency_key)
+        except QueueFullError as e:
+            log.warning(f"⏳ Hedge queue full, rejecting deposit of ${amount}", extra={"amount_usd": amount})
+            return JSONResponse(
+                status_code=429,
+                content={"risk": report.model_dump(), "status": "ERROR", "error": str(e)},
+                headers={"Retry-After": "1"},
+            )
+        if created:
+            log.info(f"✅ Queued hedge for: ${amount} (job {job.job_id})", extra={"job_id": job.job_id, "amount_usd": amount})
+        return hedge_job_response(report, job, created)
+
+    except Exception as e:
+        ERRORS.inc(component="http")
+        log.error(f"❌ Error processing deposit: {e}")
+        return {"status": "ERROR", "error": str(e)}
+
+
+def hedge_job_response(report, job, created: bool) -> JSONResponse:
+    """202 for a deposit that ordered a hedge; `hedge.status` / `status_url` tell how it went"""
+    return JSONResponse(
+        status_code=202,
+        content={
+            "risk": report.model_dump() if report is not None else None,
+            "hedged": True,
+            "hedge": {**job.to_dict(), "duplicate": not created, "status_url": f"/hedge/jobs/{job.job_id}"},
+        },
+    )
+
+if __name__ == "__main__":
+    log.info(f"🟢 Alice HedgeBot (Oracle + Executor) Starting on Port {PORT}...")
+    uvicorn.run(app, host="0.0.0.0", port=PORT)
@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+from agents.confirmations import ConfirmationTracker
+
+
+class FakeSession:
+    """The bits of ChainSession the tracker uses: a live height and a pooled HTTP session."""
+
+    def __init__(self, replies):
+        self.started = True
+        self.block_height = 1000
+        self.rpc_url = "http://node"
+        self.batches = []  # JSON-RPC batches posted
+        self.replies = replies
+        self.rpc = SimpleNamespace(session=SimpleNamespace(post=self._post))
+
+    def _post(self, url, json):
+        self.batches.append(json)
+        replies = self.replies(json)
+
+        class Response:
+            async def json(self, content_type=None):
+                return replies
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Response()
+
+
+def test_check_settles_every_transaction_with_one_batch_request():
+    confirmed, faulted, unknown, expired = (f"{i:064x}" for i in range(1, 5))
+
+    def replies(calls):
+        out = []
+        for call in calls:
+            tx = call["params"][0][2:]
+            if tx in (confirmed, faulted) and call["method"] == "getapplicationlog":
+                vmstate = "HALT" if tx == confirmed else "FAULT"
+                out.append({"id": call["id"], "result": {"executions": [{"vmstate": vmstate, "gasconsumed": "997775"}]}})
+            elif tx in (confirmed, faulted):
+                out.append({"id": call["id"], "result": 1001})
+            else:
+                out.append({"id": call["id"], "error": {"code": -100, "message": "Unknown transaction"}})
+        return out
+
+    async def run():
+        session = FakeSession(replies)
+        settled = []
+        tracker = ConfirmationTracker(session, expire_after_blocks=100, on_update=settled.append)
+        for tx in (confirmed, faulted, unknown):
+            tracker.track(f"0x{tx}", 990)
+        tracker.track(expired, 800)
+        await tracker.check(sorted([confirmed, faulted, unknown, expired]))
+        await tracker.close()
+        return session, tracker, settled
+
+    session, tracker, settled = asyncio.run(run())
+    assert len(session.batches) == 1 and len(session.batches[0]) == 8
+    assert tracker.get(confirmed).status == "CONFIRMED" and tracker.get(confirmed).block_height == 1001
+    assert tracker.get(confirmed).gas_consumed == 0.00997775
+    assert tracker.get(faulted).status == "FAULT"
+    assert tracker.get(f"0x{unknown}").status == "PENDING"
+    assert tracker.get(expired).status == "EXPIRED"
+    assert tracker.pending_count == 1
+    assert sorted(r.tx_hash for r in settled) == sorted([confirmed, faulted, expired])
@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+
+import main
+from agents import agent_oracle, agentb
+from agents.hedge_jobs import HedgeJobQueue
+from agents.risk_stream import RiskBroadcaster
+
+
+class FakeHedges:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, amount_usd, idempotency_key=None):
+        self.calls.append((amount_usd, idempotency_key))
+        return {"status": "SUCCESS", "tx_hash": f"0x{len(self.calls):064x}", "units_moved": int(amount_usd)}
+
+
+def fake_agents(monkeypatch, levels: list) -> FakeHedges:
+    """The Oracle answers with `levels` in turn; the Executor queues onto FakeHedges."""
+    hedges = FakeHedges()
+    monkeypatch.setattr(agentb, "hedge_jobs", HedgeJobQueue(hedges))
+    monkeypatch.setattr(agent_oracle, "risk_stream", RiskBroadcaster())
+
+    async def fetch_market_risk_async(asset_symbol: str):
+        level = levels.pop(0)
+        return agent_oracle.MarketRiskReport(
+            timestamp="t", asset=asset_symbol, current_price=1.0, risk_level=level,
+            recommendation="HEDGE_NOW" if level == "CRITICAL" else "HOLD", volatility=1.0,
+        )
+
+    monkeypatch.setattr(agent_oracle, "fetch_market_risk_async", fetch_market_risk_async)
+    return hedges
+
+
+async def post_deposits(*requests):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://hedgebot") as c:
+        responses = [await c.post("/deposit", **kwargs) for kwargs in requests]
+    await asyncio.sleep(0.05)  # let the queued hedges run
+    await agentb.hedge_jobs.close()
+    return responses
+
+
+def test_low_risk_deposit_holds(monkeypatch):
+    hedges = fake_agents(monkeypatch, ["LOW"])
+    (response,) = asyncio.run(post_deposits({"json": {"amount_usd": 50, "idempotency_key": "dep-1"}}))
+
+    assert response.status_code == 200
+    assert response.json()["hedged"] is False and response.json()["hedge"] is None
+    assert response.json()["risk"]["risk_level"] == "LOW"
+    assert hedges.calls == []
+
+
+def test_retried_deposit_returns_the_same_job(monkeypatch):
+    # The retry arrives after the risk dropped: it still gets the original hedge back, not a HOLD
+    hedges = fake_agents(monkeypatch, ["CRITICAL", "LOW"])
+    first, retry, body_key = asyncio.run(post_deposits(
+        {"json": {"amount_usd": 50}, "headers": {"Idempotency-Key": "dep-1"}},
+        {"json": {"amount_usd": 50}, "headers": {"Idempotency-Key": "dep-1"}},
+        {"json": {"amount_usd": 50, "idempotency_key": "dep-1"}},
+    ))
+
+    assert first.status_code == retry.status_code == body_key.status_code == 202
+    assert first.json()["hedge"]["duplicate"] is False
+    for again in (retry, body_key):
+        assert again.json()["hedged"] is True and again.json()["hedge"]["duplicate"] is True
+        assert again.json()["hedge"]["job_id"] == first.json()["hedge"]["job_id"]
+        assert again.json()["hedge"]["status_url"] == first.json()["hedge"]["status_url"]
+    assert hedges.calls == [(50.0, "dep-1")]
@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+from agents.hedge_batcher import HedgeBatcher
+
+
+class FakeSession:
+    """The bits of ChainSession the batcher uses, with no node behind it."""
+
+    def __init__(self):
+        self.block_height = 1000
+        self.account = SimpleNamespace(script_hash=b"\x01" * 20, address="NFakeWallet")
+        self.gas_token = SimpleNamespace(transfer=lambda source, destination, amount, data: SimpleNamespace(
+            script=amount.to_bytes(4, "little")))
+        self.invoked = []  # scripts broadcast
+
+    async def start(self):
+        pass
+
+    async def invoke(self, call):
+        self.invoked.append(call.script)
+        return f"0x{len(self.invoked):064x}"
+
+
+def test_hedges_within_the_window_share_one_transaction():
+    async def run():
+        session = FakeSession()
+        batcher = HedgeBatcher(session, window=0.05, max_size=3)
+        results = await asyncio.gather(*(batcher.submit(units) for units in (10, 20, 30, 40, 50)))
+        await batcher.close()
+        return session, results
+
+    session, results = asyncio.run(run())
+    assert len(session.invoked) == 2  # a full batch of 3 goes at once, the other 2 after the window
+    assert [r["units_moved"] for r in results] == [10, 20, 30, 40, 50]
+    assert [r["batch_size"] for r in results] == [3, 3, 3, 2, 2]
+    assert len({r["tx_hash"] for r in results[:3]}) == 1 and results[3]["tx_hash"] != results[0]["tx_hash"]
+    assert all(r["batch_units"] == 60 for r in results[:3])
+
+
+def test_a_failed_broadcast_fails_every_hedge_in_the_batch():
+    class BrokenSession(FakeSession):
+        async def invoke(self, call):
+            raise RuntimeError("node down")
+
+    async def run():
+        batcher = HedgeBatcher(BrokenSession(), window=0.01)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        await batcher.close()
+        return results
+
+    assert [str(r) for r in asyncio.run(run())] == ["node down", "node down"]
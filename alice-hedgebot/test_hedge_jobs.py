@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+from agents.hedge_jobs import HedgeJobQueue, QueueFullError, check_callback_url
+from agents.hedge_ledger import HedgeLedger
+
+
+class FakeHedges:
+    """`run_hedge` stand-in: records every call, optionally blocks until released."""
+
+    def __init__(self, block: bool = False):
+        self.calls = []
+        self.release = asyncio.Event()
+        if not block:
+            self.release.set()
+
+    async def __call__(self, amount_usd, idempotency_key=None):
+        self.calls.append((amount_usd, idempotency_key))
+        await self.release.wait()
+        return {"status": "SUCCESS", "tx_hash": f"0x{len(self.calls):064x}", "units_moved": int(amount_usd)}
+
+
+async def wait_done(job):
+    while not job.done:
+        await asyncio.sleep(0.01)
+    return job
+
+
+def test_duplicate_idempotency_key_returns_the_same_job():
+    async def run():
+        hedges = FakeHedges()
+        queue = HedgeJobQueue(hedges)
+        first, created = await queue.submit(100.0, "deposit-1")
+        again, created_again = await queue.submit(100.0, "deposit-1")
+        await wait_done(first)
+        after, _ = await queue.submit(100.0, "deposit-1")
+        await queue.close()
+        return hedges, first, created, again, created_again, after
+
+    hedges, first, created, again, created_again, after = asyncio.run(run())
+    assert created and not created_again
+    assert again is first and after is first
+    assert first.status == "SUCCEEDED"
+    assert hedges.calls == [(100.0, "deposit-1")]
+
+
+def test_full_queue_raises_queue_full_error():
+    async def run():
+        hedges = FakeHedges(block=True)
+        queue = HedgeJobQueue(hedges, workers=1, max_pending=2)
+        running, _ = await queue.submit(1.0)
+        await asyncio.sleep(0)  # the worker takes it off the queue
+        await queue.submit(2.0)
+        await queue.submit(3.0)
+        with pytest.raises(QueueFullError):
+            await queue.submit(4.0)
+        pending = queue.pending
+
+        hedges.release.set()
+        await wait_done(running)
+        await queue.close()
+        return pending
+
+    assert asyncio.run(run()) == 2
+
+
+def test_callback_urls_must_point_to_an_allowed_host():
+    allowed = frozenset({"hooks.example.com"})
+    check_callback_url("https://hooks.example.com/hedged", allowed)
+    for url in ("http://169.254.169.254/latest", "file:///etc/passwd", "https://hooks.example.com.evil.io/"):
+        with pytest.raises(ValueError):
+            check_callback_url(url, allowed)
+
+    async def run():
+        queue = HedgeJobQueue(FakeHedges(), callback_hosts=allowed)
+        with pytest.raises(ValueError):
+            await queue.submit(1.0, callback_url="http://localhost:8000/hedges")
+        await queue.close()
+
+    asyncio.run(run())
+
+
+def test_keys_and_queued_jobs_survive_a_restart(tmp_path):
+    path = str(tmp_path / "hedges.db")
+
+    async def first_life():
+        ledger = HedgeLedger(path)
+        await ledger.start()
+        hedges = FakeHedges(block=True)
+        queue = HedgeJobQueue(hedges, workers=1, store=ledger, drain_timeout=5.0)
+        done, _ = await queue.submit(10.0, "done-key")
+        hedges.release.set()
+        await wait_done(done)
+        hedges.release.clear()
+        running, _ = await queue.submit(20.0, "running-key")
+        await asyncio.sleep(0.05)
+        queued, _ = await queue.submit(30.0, "queued-key")
+
+        # Shutdown waits for the running hedge and keeps the queued one for later
+        closing = asyncio.create_task(queue.close())
+        await asyncio.sleep(0.05)
+        hedges.release.set()
+        await closing
+        await ledger.close()
+        return hedges, done, running, queued
+
+    async def second_life():
+        ledger = HedgeLedger(path)
+        await ledger.start()
+        hedges = FakeHedges()
+        queue = HedgeJobQueue(hedges, store=ledger)
+        requeued = await queue.restore()
+        queue.start()
+        done, created = await queue.submit(10.0, "done-key")
+        queued = await wait_done(await queue.find_by_key("queued-key"))
+        await queue.close()
+        await ledger.close()
+        return hedges, requeued, done, created, queued
+
+    hedges, done, running, queued = asyncio.run(first_life())
+    assert running.status == "SUCCEEDED" and queued.status == "QUEUED"
+    assert hedges.calls == [(10.0, "done-key"), (20.0, "running-key")]
+
+    hedges, requeued, done_again, created, queued_again = asyncio.run(second_life())
+    assert requeued == 1
+    assert not created and done_again.job_id == done.job_id and done_again.status == "SUCCEEDED"
+    assert queued_again.job_id == queued.job_id and queued_again.status == "SUCCEEDED"
+    assert hedges.calls == [(30.0, "queued-key")]  # the finished hedge is never run again
+
+
+def test_interrupted_running_job_is_settled_from_the_ledger_not_rerun(tmp_path):
+    path = str(tmp_path / "hedges.db")
+
+    async def crash_mid_hedge():
+        ledger = HedgeLedger(path)
+        await ledger.start()
+        hedges = FakeHedges(block=True)
+        queue = HedgeJobQueue(hedges, workers=2, store=ledger)
+        await queue.submit(10.0, "broadcast-key")
+        await queue.submit(20.0, "lost-key")
+        await asyncio.sleep(0.05)  # both RUNNING, on disk
+        # The first transfer made it into the ledger before the process died
+        ledger.append(10.0, {"status": "SUCCESS", "tx_hash": "0xabc", "units_moved": 10}, "broadcast-key")
+        await ledger.flush()
+        await ledger.close()
+
+    async def restart():
+        ledger = HedgeLedger(path)
+        await ledger.start()
+        hedges = FakeHedges()
+        queue = HedgeJobQueue(hedges, store=ledger)
+        requeued = await queue.restore()
+        broadcast = await queue.find_by_key("broadcast-key")
+        lost = await queue.find_by_key("lost-key")
+        await queue.close()
+        await ledger.close()
+        return hedges, requeued, broadcast, lost
+
+    asyncio.run(crash_mid_hedge())
+    hedges, requeued, broadcast, lost = asyncio.run(restart())
+    assert requeued == 0 and hedges.calls == []
+    assert broadcast.status == "SUCCEEDED" and broadcast.result["tx_hash"] == "abc"
+    assert lost.status == "FAILED" and "Interrupted" in lost.result["error"]
@@ -0,0 +1,69 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from agents.confirmations import Confirmation
+from agents.hedge_ledger import HedgeLedger
+
+
+def hedge(i: int, wallet: str = "NWallet") -> dict:
+    return {"status": "SUCCESS", "tx_hash": f"0x{i:064x}", "units_moved": i, "gas_locked": i / 1e8,
+            "wallet": wallet, "block_height": 100 + i}
+
+
+def test_keyset_pagination_walks_every_hedge_once_newest_first(tmp_path):
+    async def run():
+        ledger = HedgeLedger(str(tmp_path / "hedges.db"))
+        await ledger.start()
+        for i in range(1, 26):
+            ledger.append(float(i), hedge(i, "NOther" if i % 5 == 0 else "NWallet"))
+        await ledger.flush()
+
+        pages, cursor = [], None
+        while True:
+            page = await ledger.query(cursor=cursor, limit=10)
+            pages.append([row["units"] for row in page["hedges"]])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        filtered = await ledger.query(wallet="NOther", limit=2)
+        last = await ledger.query(wallet="NOther", cursor=filtered["next_cursor"], limit=2)
+        await ledger.close()
+        return pages, filtered, last
+
+    pages, filtered, last = asyncio.run(run())
+    assert [len(p) for p in pages] == [10, 10, 5]
+    assert sum(pages, []) == list(range(25, 0, -1))
+    assert [row["units"] for row in filtered["hedges"]] == [25, 20]
+    assert [row["units"] for row in last["hedges"]] == [15, 10] and last["next_cursor"] is not None
+
+
+def test_confirmations_join_and_rows_are_append_only(tmp_path):
+    path = str(tmp_path / "hedges.db")
+
+    settled = Confirmation(f"0x{1:064x}", 101, "CONFIRMED", block_height=102, vm_state="HALT",
+                           gas_consumed=0.0099, confirmed_at=1.0)
+
+    async def run():
+        ledger = HedgeLedger(path)
+        await ledger.start()
+        ledger.append(1.0, hedge(1))
+        ledger.append(2.0, hedge(2))
+        ledger.record_confirmation(settled)
+        await ledger.flush()
+        rows = (await ledger.query())["hedges"]
+        pending = await ledger.unconfirmed()
+        await ledger.close()
+        return rows, pending
+
+    rows, pending = asyncio.run(run())
+    assert [(r["units"], r["confirmation"]) for r in rows] == [(2, "PENDING"), (1, "CONFIRMED")]
+    assert pending == [(f"{2:064x}", 102)]
+
+    conn = sqlite3.connect(path)
+    with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+        conn.execute("UPDATE hedges SET status = 'ERROR'")
+    with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+        conn.execute("DELETE FROM confirmations")
+    conn.close()
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import httpx
+
+from agents.market_data import MarketDataClient
+from bench.stand_ins import create_coingecko_app
+
+LATENCY = 0.05
+
+
+def fake_coingecko(**kwargs):
+    app = create_coingecko_app(latency=LATENCY)
+    transport = httpx.ASGITransport(app=app)
+    client = MarketDataClient(url="http://coingecko/api/v3/coins/markets", transport=transport, **kwargs)
+    return client, transport
+
+
+async def upstream_calls(transport) -> int:
+    async with httpx.AsyncClient(transport=transport, base_url="http://coingecko") as http:
+        return (await http.get("/_stats")).json().get("coins/markets", 0)
+
+
+def test_concurrent_get_market_calls_share_one_upstream_request():
+    async def run():
+        client, transport = fake_coingecko()
+        rows = await asyncio.gather(*(client.get_market("NEO") for _ in range(20)))
+        calls = await upstream_calls(transport)
+        await client.aclose()
+        return rows, calls
+
+    rows, calls = asyncio.run(run())
+    assert calls == 1
+    assert all(row is rows[0] for row in rows)
+    assert rows[0]["id"] == "neo"
+
+
+def test_stale_entry_is_served_at_once_with_one_background_refresh():
+    async def run():
+        client, transport = fake_coingecko(ttl=0.01, stale_ttl=60)
+        first = await client.get_market("neo")
+        await asyncio.sleep(0.02)  # now stale
+
+        start = time.perf_counter()
+        stale = await asyncio.gather(*(client.get_market("neo") for _ in range(10)))
+        elapsed = time.perf_counter() - start
+
+        await asyncio.sleep(LATENCY * 3)  # let the refresh land
+        calls = await upstream_calls(transport)
+        refreshed = await client.get_market("neo")
+        await client.aclose()
+        return first, stale, elapsed, calls, refreshed
+
+    first, stale, elapsed, calls, refreshed = asyncio.run(run())
+    assert all(row is first for row in stale)
+    assert elapsed < LATENCY  # nobody waited for the upstream
+    assert calls == 2  # initial fetch + ONE refresh for ten stale reads
+    assert refreshed is not first
+
+
+def test_get_markets_fetches_every_missing_asset_in_one_query():
+    async def run():
+        client, transport = fake_coingecko()
+        await client.get_market("neo")
+        rows = await client.get_markets(["neo", "gas", "bitcoin", "GAS"])
+        calls = await upstream_calls(transport)
+        await client.aclose()
+        return rows, calls
+
+    rows, calls = asyncio.run(run())
+    assert sorted(rows) == ["bitcoin", "gas", "neo"]
+    assert calls == 2  # neo alone, then gas + bitcoin together
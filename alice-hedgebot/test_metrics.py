@@ -0,0 +1,45 @@
+import pytest
+
+from agents import metrics
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    latency = metrics.Histogram("test_latency_seconds", "Test latency.", ("endpoint",), buckets=(0.5, 0.1, 1.0))
+    for value in (0.05, 0.1, 0.3, 2.0):
+        latency.observe(value, endpoint="/x")
+    latency.observe(0.7, endpoint='/say "hi"')
+
+    lines = [line for line in metrics.render().splitlines() if "test_latency_seconds" in line]
+    assert lines[:2] == ["# HELP test_latency_seconds Test latency.", "# TYPE test_latency_seconds histogram"]
+    assert lines[2:] == [
+        # buckets come out sorted; a value equal to a bound lands in it (le = less or equal)
+        'test_latency_seconds_bucket{endpoint="/say \\"hi\\"",le="0.1"} 0',
+        'test_latency_seconds_bucket{endpoint="/say \\"hi\\"",le="0.5"} 0',
+        'test_latency_seconds_bucket{endpoint="/say \\"hi\\"",le="1"} 1',
+        'test_latency_seconds_bucket{endpoint="/say \\"hi\\"",le="+Inf"} 1',
+        'test_latency_seconds_sum{endpoint="/say \\"hi\\""} 0.7',
+        'test_latency_seconds_count{endpoint="/say \\"hi\\""} 1',
+        'test_latency_seconds_bucket{endpoint="/x",le="0.1"} 2',
+        'test_latency_seconds_bucket{endpoint="/x",le="0.5"} 3',
+        'test_latency_seconds_bucket{endpoint="/x",le="1"} 3',
+        'test_latency_seconds_bucket{endpoint="/x",le="+Inf"} 4',
+        'test_latency_seconds_sum{endpoint="/x"} 2.45',
+        'test_latency_seconds_count{endpoint="/x"} 4',
+    ]
+
+
+def test_counter_renders_labels_and_rejects_wrong_ones():
+    transitions = metrics.Counter("test_transitions_total", "Test transitions.", ("asset", "to_level"))
+    transitions.inc(asset="neo", to_level="CRITICAL")
+    transitions.inc(2, asset="neo", to_level="CRITICAL")
+    unlabelled = metrics.Counter("test_events_total", "Test events.")
+    unlabelled.inc(0.5)
+
+    text = metrics.render()
+    assert text.endswith("\n")
+    assert 'test_transitions_total{asset="neo",to_level="CRITICAL"} 3' in text.splitlines()
+    assert "test_events_total 0.5" in text.splitlines()
+    with pytest.raises(ValueError):
+        transitions.inc(asset="neo")
+    with pytest.raises(ValueError):
+        metrics.Counter("test_events_total", "Registered twice.")
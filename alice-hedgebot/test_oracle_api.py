@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+
+from agents import agent_oracle
+from agents.market_data import MarketDataClient
+from agents.risk_stream import RiskBroadcaster
+from bench.stand_ins import create_coingecko_app
+
+
+def post_batch(monkeypatch, body=None, params=None):
+    transport = httpx.ASGITransport(app=create_coingecko_app(latency=0))
+    monkeypatch.setattr(agent_oracle, "market_data", MarketDataClient(url="http://coingecko/api/v3/coins/markets", transport=transport))
+    monkeypatch.setattr(agent_oracle, "risk_stream", RiskBroadcaster())
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=agent_oracle.app), base_url="http://oracle") as c:
+            response = await c.post("/market-risk/batch", json=body, params=params)
+        await agent_oracle.market_data.aclose()
+        return response.json()
+
+    return asyncio.run(run())
+
+
+def test_batch_accepts_a_comma_separated_string(monkeypatch):
+    # Regression: a string used to be iterated character by character ("n", "e", "o", ",", ...)
+    reports = post_batch(monkeypatch, {"asset_symbols": "neo, bitcoin,gas"})
+    assert [r["asset"] for r in reports] == ["neo", "bitcoin", "gas"]
+    assert all(r["risk_level"] != "ERROR" for r in reports)
+
+
+def test_batch_accepts_a_list_and_the_query_string(monkeypatch):
+    assert [r["asset"] for r in post_batch(monkeypatch, {"asset_symbols": ["neo", "gas"]})] == ["neo", "gas"]
+    assert [r["asset"] for r in post_batch(monkeypatch, params={"asset_symbols": "neo,gas"})] == ["neo", "gas"]
+
+
+def test_batch_rejects_malformed_asset_symbols(monkeypatch):
+    for value in (42, ["neo", 1], {"neo": True}):
+        assert post_batch(monkeypatch, {"asset_symbols": value}) == {
+            "error": "asset_symbols must be a list of strings or a comma-separated string"
+        }
+    for value in ("", " , ", []):
+        assert post_batch(monkeypatch, {"asset_symbols": value}) == {"error": "asset_symbols is required"}
+
+
+def test_single_and_batch_assessments_agree():
+    # Around both thresholds (CRITICAL 0.1%, MEDIUM 0.005%); 24h snapshot metrics, no rolling state
+    rows = {
+        f"asset{i}": {"current_price": 100.0, "high_24h": 100.0 + up, "low_24h": 100.0 - down,
+                      "price_change_percentage_24h": 0.0}
+        for i, (up, down) in enumerate([(0, 0), (0.004, 0), (0, 0.006), (0.09, 0), (0.05, 0.06), (2, 1)])
+    }
+    batch = agent_oracle.assess_market_risk_batch(list(rows), rows)
+    single = [agent_oracle.assess_market_risk(a, row) for a, row in rows.items()]
+
+    assert [r.risk_level for r in single] == ["LOW", "LOW", "MEDIUM", "MEDIUM", "CRITICAL", "CRITICAL"]
+    assert [(r.risk_level, r.recommendation) for r in single] == [(r.risk_level, r.recommendation) for r in batch]
+    assert agent_oracle.assess_market_risk("asset0", rows["asset0"], force_trigger=True).recommendation == "HEDGE_NOW"
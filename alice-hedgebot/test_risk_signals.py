@@ -0,0 +1,71 @@
+import asyncio
+
+import httpx
+
+from agents import agent_oracle, agentb
+from agents.hedge_jobs import HedgeJobQueue
+from agents.market_data import MarketDataClient
+from agents.risk_stream import RiskBroadcaster
+from bench.stand_ins import create_coingecko_app
+
+
+class FakeHedges:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, amount_usd, idempotency_key=None):
+        self.calls.append((amount_usd, idempotency_key))
+        return {"status": "SUCCESS"}
+
+
+def critical(asset: str, timestamp: str = "t1") -> dict:
+    return {"asset": asset, "risk_level": "CRITICAL", "volatility": 5.0, "timestamp": timestamp}
+
+
+def fake_oracle(monkeypatch):
+    """Oracle on the stand-in CoinGecko (any id is a known asset, demo thresholds: always CRITICAL)."""
+    transport = httpx.ASGITransport(app=create_coingecko_app(latency=0))
+    monkeypatch.setattr(agent_oracle, "market_data", MarketDataClient(url="http://coingecko/api/v3/coins/markets", transport=transport))
+    monkeypatch.setattr(agent_oracle, "risk_stream", RiskBroadcaster())
+    monkeypatch.setattr(agent_oracle, "poller_stream", RiskBroadcaster())
+    monkeypatch.setattr(agent_oracle, "WATCH_ASSETS", {"neo"})
+
+
+def test_only_configured_assets_are_auto_hedged(monkeypatch):
+    hedges = FakeHedges()
+    monkeypatch.setattr(agentb, "hedge_jobs", HedgeJobQueue(hedges))
+    monkeypatch.setattr(agentb, "risk_signals", {})
+    monkeypatch.setattr(agentb, "AUTO_HEDGE_USD", 5.0)
+    monkeypatch.setattr(agentb, "AUTO_HEDGE_ASSETS", frozenset({"neo"}))
+
+    async def run():
+        for asset in ("neo", "bitcoin", "doesnotexist"):
+            await agentb.on_risk_signal(critical(asset))
+        await agentb.on_risk_signal(critical("neo", "t2"))  # still CRITICAL: no second hedge
+        await asyncio.sleep(0.05)
+        await agentb.hedge_jobs.close()
+
+    asyncio.run(run())
+    assert hedges.calls == [(5.0, "critical:neo:t1")]
+    assert sorted(agentb.risk_signals) == ["bitcoin", "doesnotexist", "neo"]
+
+
+def test_request_reports_never_reach_the_executor_feed(monkeypatch):
+    fake_oracle(monkeypatch)
+
+    async def run():
+        feed = agent_oracle.poller_stream.subscribe()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=agent_oracle.app), base_url="http://oracle") as c:
+            reports = (await c.post("/market-risk/batch", json={"asset_symbols": "neo, bitcoin,doesnotexist"})).json()
+            await c.post("/market-risk", json={"asset_symbol": "gas"})
+        from_requests = feed.queue.qsize()
+
+        await agent_oracle.poll_once()
+        polled = [feed.queue.get_nowait()["asset"] for _ in range(feed.queue.qsize())]
+        await agent_oracle.market_data.aclose()
+        return reports, from_requests, polled
+
+    reports, from_requests, polled = asyncio.run(run())
+    assert [r["risk_level"] for r in reports] == ["CRITICAL"] * 3
+    assert from_requests == 0
+    assert polled == ["neo"]
@@ -0,0 +1,32 @@
+from agents.risk_stream import RiskBroadcaster
+
+
+def report(level: str, volatility: float, asset: str = "NEO") -> dict:
+    return {"asset": asset, "risk_level": level, "volatility": volatility}
+
+
+def test_should_publish_only_meaningful_changes():
+    stream = RiskBroadcaster(volatility_delta=0.5)
+    assert not stream.should_publish(report("ERROR", 0.0))
+    assert stream.publish(report("LOW", 1.0))
+
+    assert not stream.should_publish(report("LOW", 1.4))  # below the delta
+    assert stream.should_publish(report("LOW", 1.5))  # a move of exactly the delta counts
+    assert stream.should_publish(report("LOW", 0.5))  # in either direction
+    assert stream.should_publish(report("MEDIUM", 1.0))  # a level change always does
+    assert not stream.should_publish(report("ERROR", 9.0))  # a failed fetch is never news
+    assert stream.should_publish(report("LOW", 1.0, asset="gas"))  # first report for an asset
+    assert not stream.should_publish(report("LOW", 1.0, asset="neo"))  # assets are case-insensitive
+
+
+def test_publish_updates_the_baseline_and_filters_subscribers():
+    stream = RiskBroadcaster(volatility_delta=0.5)
+    neo, everything = stream.subscribe({"NEO"}), stream.subscribe()
+    for r in (report("LOW", 1.0), report("LOW", 1.3), report("LOW", 1.6), report("LOW", 1.0, asset="gas")):
+        stream.publish(r)
+
+    # 1.3 was dropped, so 1.6 is measured against 1.0, not against 1.3
+    assert [r["volatility"] for r in stream.latest({"neo"})] == [1.6]
+    received = [everything.queue.get_nowait() for _ in range(everything.queue.qsize())]
+    assert [(r["asset"], r["volatility"]) for r in received] == [("NEO", 1.0), ("NEO", 1.6), ("gas", 1.0)]
+    assert neo.queue.qsize() == 2
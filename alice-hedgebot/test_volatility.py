@@ -0,0 +1,107 @@
+import asyncio
+import math
+
+import httpx
+import numpy as np
+import pytest
+
+from agents import agent_oracle
+from agents.market_data import MarketDataClient
+from agents.risk_stream import RiskBroadcaster
+from agents.volatility import RollingVolatility, VolatilityEngine
+
+
+def feed(state: RollingVolatility, returns):
+    price = 100.0
+    state.update(price, timestamp=0)
+    readings = {}
+    for tick, r in enumerate(returns, start=1):
+        price *= math.exp(r)
+        state.update(price, timestamp=tick)
+        readings[state.ticks] = (state.ewma_volatility_pct, state.realized_volatility_pct)
+    return readings
+
+
+def test_constant_noise_gives_constant_volatility_while_the_window_fills():
+    # +-0.1% every tick: the market never changes, so neither should the reported volatility
+    step = math.log(1.001)
+    state = RollingVolatility(capacity=360)
+    readings = feed(state, [step if i % 2 == 0 else -step for i in range(1000)])
+
+    expected = step * math.sqrt(359) * 100
+    for tick in (30, 100, 359, 360, 1000):
+        ewma, realized = readings[tick]
+        assert ewma == pytest.approx(expected, rel=1e-9)
+        assert realized == pytest.approx(expected, rel=0.05)
+
+
+def test_stationary_random_noise_does_not_drift_during_warm_up():
+    rng = np.random.default_rng(7)
+    state = RollingVolatility(capacity=360)
+    readings = feed(state, rng.normal(0.0, 0.001, 2000))
+
+    expected = 0.001 * math.sqrt(359) * 100  # ~1.89%
+    # Realized volatility over the window: same level at tick 30 as after the buffer is full
+    for tick in (30, 100, 359, 2000):
+        assert readings[tick][1] == pytest.approx(expected, rel=0.3)
+    early, full = readings[30][1], readings[359][1]
+    assert 0.75 < early / full < 1.33
+
+
+def test_engine_is_ready_after_min_ticks():
+    engine = VolatilityEngine(capacity=10, min_ticks=3)
+    engine.update("NEO", 10.0)
+    engine.update("neo", 10.1)
+    assert engine.ready("neo") is None
+    engine.update("neo", 9.9)
+    state = engine.ready("neo")
+    assert state is not None and state.ticks == 3
+    assert state.window_high == 10.1
+    assert state.drawdown_pct == pytest.approx((10.1 - 9.9) / 10.1 * 100)
+
+
+def test_vectorized_rolling_metrics_match_the_engine():
+    # The backtest's whole-series path must give the Oracle's numbers at every tick
+    from backtest import rolling_max
+    from agents.risk_rules import rolling_metrics
+
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0, 0.002, 3000)))
+    window = 50
+    drawdown, volatility = rolling_metrics(close, rolling_max(close, window), window, ewma_lambda=0.94)
+
+    state = RollingVolatility(capacity=window, ewma_lambda=0.94)
+    for i, price in enumerate(close):
+        state.update(price, timestamp=i)
+        assert drawdown[i] == pytest.approx(state.drawdown_pct, rel=1e-9, abs=1e-12)
+        assert volatility[i] == pytest.approx(state.ewma_volatility_pct, rel=1e-9, abs=1e-12)
+
+
+def test_oracle_ticks_come_from_the_poller_once_per_upstream_update(monkeypatch):
+    quote = {"id": "neo", "current_price": 10.0, "high_24h": 11.0, "low_24h": 9.0,
+             "price_change_percentage_24h": 0.0, "last_updated": "2026-01-01T00:00:00Z"}
+    upstream = httpx.MockTransport(lambda request: httpx.Response(200, json=[quote]))
+    monkeypatch.setattr(agent_oracle, "market_data", MarketDataClient(url="http://coingecko/markets", ttl=0, transport=upstream))
+    monkeypatch.setattr(agent_oracle, "volatility_engine", VolatilityEngine(capacity=10, min_ticks=2))
+    monkeypatch.setattr(agent_oracle, "_last_tick_quote", {})
+    monkeypatch.setattr(agent_oracle, "risk_stream", RiskBroadcaster())
+    monkeypatch.setattr(agent_oracle, "poller_stream", RiskBroadcaster())
+    monkeypatch.setattr(agent_oracle, "WATCH_ASSETS", {"neo"})
+
+    async def run():
+        ticks = []
+        for _ in range(5):  # request traffic never moves the window
+            await agent_oracle.fetch_market_risk_async("neo")
+        ticks.append(agent_oracle.volatility_engine.get("neo"))
+
+        await agent_oracle.poll_once()
+        await agent_oracle.poll_once()  # CoinGecko has not updated the quote yet
+        ticks.append(agent_oracle.volatility_engine.get("neo").ticks)
+
+        quote.update(current_price=10.1, last_updated="2026-01-01T00:01:00Z")
+        await agent_oracle.poll_once()
+        ticks.append(agent_oracle.volatility_engine.get("neo").ticks)
+        await agent_oracle.market_data.aclose()
+        return ticks
+
+    assert asyncio.run(run()) == [None, 1, 2]